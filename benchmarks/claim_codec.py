@@ -0,0 +1,80 @@
+"""Compare the compact claim codec with the zlib+base64 claim keys scheme.
+
+Usage:
+    python -m benchmarks.claim_codec [--iterations 100000] [--roles 3]
+"""
+
+import argparse
+import timeit
+import uuid
+
+import jwt
+
+from config.default import (
+    JWT_ALG,
+    JWT_ENCODING_PARAM_1,
+    JWT_ENCODING_PARAM_2,
+    JWT_ENCODING_PARAM_3,
+    SECRET_KEY,
+)
+from core.auth.generic_encoder_decoder import (
+    decode_as_base64,
+    encode_as_base64,
+)
+from core.auth.jwt.claims import decode_claims, encode_claims
+
+
+def legacy_encode(user_id, roles, email):
+    """Build the payload the way auth_guard used to expect it."""
+    return {
+        encode_as_base64(JWT_ENCODING_PARAM_1): encode_as_base64(str(user_id)),
+        encode_as_base64(JWT_ENCODING_PARAM_3): email,
+        encode_as_base64(JWT_ENCODING_PARAM_2): list(roles),
+    }
+
+
+def legacy_decode(payload):
+    """Read the payload the way auth_guard used to read it."""
+    user_id = decode_as_base64(payload[encode_as_base64(JWT_ENCODING_PARAM_1)])
+    roles = payload[encode_as_base64(JWT_ENCODING_PARAM_2)]
+    return user_id, roles
+
+
+def main():
+    """Print the token sizes and the encode/decode timings of both schemes."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=100000)
+    parser.add_argument("--roles", type=int, default=3)
+    args = parser.parse_args()
+
+    user_id = uuid.uuid4()
+    roles = [f"role-{index}" for index in range(args.roles)]
+    email = "john.doe@example.com"
+    algorithm = JWT_ALG or "HS256"
+
+    schemes = {
+        "zlib+base64": (legacy_encode, legacy_decode),
+        "claim codec": (encode_claims, decode_claims),
+    }
+    print(
+        f"{'scheme':<14}{'token bytes':>12}"
+        f"{'encode us':>12}{'decode us':>12}"
+    )
+    for name, (encode, decode) in schemes.items():
+        payload = encode(user_id, roles, email)
+        token = jwt.encode(payload, SECRET_KEY, algorithm=algorithm)
+        encode_time = timeit.timeit(
+            lambda: encode(user_id, roles, email), number=args.iterations
+        )
+        decode_time = timeit.timeit(
+            lambda: decode(payload), number=args.iterations
+        )
+        print(
+            f"{name:<14}{len(token):>12}"
+            f"{encode_time / args.iterations * 1e6:>12.2f}"
+            f"{decode_time / args.iterations * 1e6:>12.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
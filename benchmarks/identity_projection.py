@@ -0,0 +1,75 @@
+"""Compare loading a full GwUser with loading its Identity projection.
+
+The ids of existing users of the configured database are looked up in
+turn, once through the ORM (GwUser.query.get) and once through
+GwUser.get_identity_by_id. The session is removed after every lookup, as
+at the end of a request, so both paths pay for a cold identity map. The
+median latency and the peak of memory allocated by a lookup (traced
+with tracemalloc) are printed; the timings include the tracing overhead.
+
+Usage:
+    python -m benchmarks.identity_projection [--users 1000] [--runs 5]
+        [--settings config.DevelopmentConfig]
+"""
+
+import argparse
+import statistics
+import time
+import tracemalloc
+
+from core import create_app, db
+from core.users.models import GwUser
+
+
+def run(lookup, ids: list) -> tuple:
+    """Look the ids up and give the median ms and peak bytes of a lookup."""
+    timings = []
+    peaks = []
+    tracemalloc.start()
+    for user_id in ids:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        lookup(user_id)
+        timings.append(time.perf_counter() - started)
+        peaks.append(tracemalloc.get_traced_memory()[1] - before)
+        db.session.remove()
+    tracemalloc.stop()
+    return statistics.median(timings) * 1e3, statistics.median(peaks)
+
+
+def main():
+    """Time both lookups over the same users and print their costs."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--settings", default="config.DevelopmentConfig")
+    args = parser.parse_args()
+
+    app = create_app(args.settings)
+    with app.app_context():
+        ids = (
+            db.session.execute(db.select(GwUser.id).limit(args.users))
+            .scalars()
+            .all()
+        )
+        db.session.remove()
+        if not ids:
+            raise SystemExit("No user to look up, seed the database first.")
+
+        lookups = {
+            "GwUser.query.get": GwUser.query.get,
+            "get_identity_by_id": GwUser.get_identity_by_id,
+        }
+        print(f"{'lookup':<20}{'median ms':>11}{'peak bytes':>12}")
+        for name, lookup in lookups.items():
+            # Warm the pool of connections and the compiled statements.
+            run(lookup, ids[:10])
+            results = [run(lookup, ids) for _ in range(args.runs)]
+            latency = statistics.median(result[0] for result in results)
+            allocated = statistics.median(result[1] for result in results)
+            print(f"{name:<20}{latency:>11.3f}{allocated:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
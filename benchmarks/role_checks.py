@@ -0,0 +1,61 @@
+"""Compare the role checks on names with the checks on roles masks.
+
+The former path looked the role up in the list of names of the token, then
+in the roles of the user read from the database, which were GwUserRole
+objects: the name never matched them and the check always reached the
+database. The roles masks path is an AND against the precompiled mask of
+the roles implying the required one, the database read is not timed here.
+
+Usage:
+    python -m benchmarks.role_checks [--iterations 1000000] [--roles 8]
+"""
+
+import argparse
+import timeit
+from typing import NamedTuple
+
+from core.auth.roles import RoleRegistry
+
+
+class StoredRole(NamedTuple):
+    """Stand for a GwUserRole row."""
+
+    role: str
+
+
+def main():
+    """Print the time of a granted and of a denied check with both paths."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=1000000)
+    parser.add_argument("--roles", type=int, default=8)
+    args = parser.parse_args()
+
+    names = [f"role-{index}" for index in range(args.roles)]
+    registry = RoleRegistry(names + ["missing"])
+    user_names = names[: args.roles // 2] or names[:1]
+    token_roles = list(user_names)
+    stored_roles = [StoredRole(name) for name in user_names]
+    user_mask = registry.mask(user_names)
+
+    print(f"{'check':<22}{'names ns':>10}{'mask ns':>10}")
+    for label, role in (
+        ("granted (last role)", user_names[-1]),
+        ("denied", "missing"),
+    ):
+        requirement = registry.require([role])
+        by_name = timeit.timeit(
+            lambda: role in token_roles or role in stored_roles,
+            number=args.iterations,
+        )
+        by_mask = timeit.timeit(
+            lambda: registry.allows(user_mask, requirement),
+            number=args.iterations,
+        )
+        print(
+            f"{label:<22}{by_name / args.iterations * 1e9:>10.1f}"
+            f"{by_mask / args.iterations * 1e9:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Exercise the pooled scoring client against a local stand-in scoring server.
+
+The stand-in server answers like the password scoring service, keeping the
+connections alive, so a burst of signups can be replayed without network.
+
+Usage:
+    python -m benchmarks.scoring_pool [--calls 1000] [--concurrency 20]
+"""
+
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    """Declare a stand-in of the password scoring service."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        """Score the password with a naive length rule."""
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length))
+        password = payload["password"]
+        characteristics = payload["characteristics"]
+        score = min(100, len(password) * 6)
+        body = {"score": score}
+        if not (
+            int(characteristics["min_length"])
+            <= len(password)
+            <= int(characteristics["max_length"])
+        ):
+            body["message_password"] = (
+                "The password is not meeting the length and/or characters"
+                " requirements !"
+            )
+        elif score < int(payload["min_accepted_score"]):
+            body["message_score"] = "The strength of the password is too low !"
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        """Keep the console quiet."""
+
+
+def start_stub_server() -> ThreadingHTTPServer:
+    """Start the stand-in server on a free local port.
+
+    Returns:
+        ThreadingHTTPServer: the running server.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ScoringHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    """Replay a burst of password validations and print the pool usage."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    # Imported here as it reads the settings, the stand-in server does not.
+    from core.services.validators.passwords import PasswordValidator
+
+    server = start_stub_server()
+    url_api = f"http://127.0.0.1:{server.server_port}/score"
+
+    def call(index):
+        started = time.perf_counter()
+        PasswordValidator.is_valid_password(
+            url_api=url_api, password=f"Sup3r-Secret-{index}"
+        )
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        latencies = sorted(executor.map(call, range(args.calls)))
+    elapsed = time.perf_counter() - started
+    server.shutdown()
+
+    print(f"calls:      {args.calls} in {elapsed:.2f}s")
+    print(f"throughput: {args.calls / elapsed:.0f} calls/s")
+    print(f"p50:        {latencies[len(latencies) // 2] * 1e3:.2f} ms")
+    print(f"p99:        {latencies[int(len(latencies) * 0.99)] * 1e3:.2f} ms")
+    print(json.dumps(PasswordValidator.get_pool_stats(), indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Show the plans and timings of the users hot lookups around their indexes.
+
+The tables are created in a scratch schema of the configured database,
+seeded with generate_series, then the lookups are explained and timed
+before and after the creation of the indexes of the migrations 0003 and
+0005. The scratch schema is dropped at the end.
+
+Usage:
+    python -m benchmarks.user_indexes [--users 1000000] [--runs 20]
+        [--database-url postgresql://...]
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+from sqlalchemy import create_engine, text
+
+SCHEMA = "bench_user_indexes"
+
+TABLES = f"""
+CREATE TABLE {SCHEMA}.gw_user (
+    id uuid PRIMARY KEY,
+    username varchar(30) NOT NULL UNIQUE,
+    email varchar(80) NOT NULL UNIQUE,
+    password varchar(255) NOT NULL,
+    created_on timestamp NOT NULL,
+    active boolean NOT NULL,
+    deleted boolean NOT NULL,
+    is_admin boolean
+);
+CREATE TABLE {SCHEMA}.gw_user_role (
+    id serial PRIMARY KEY,
+    role varchar(50) NOT NULL,
+    gwuser_id uuid NOT NULL REFERENCES {SCHEMA}.gw_user (id),
+    created_on timestamp NOT NULL
+);
+"""
+
+# 90% of active users, 2% of deleted ones, one role each.
+SEED = f"""
+INSERT INTO {SCHEMA}.gw_user
+SELECT gen_random_uuid(), 'user' || n, 'User' || n || '@Example.com',
+       'scrypt:32768:8:1$salt$hash',
+       now() - make_interval(secs => :users - n),
+       n % 10 <> 0, n % 50 = 0, false
+FROM generate_series(1, :users) AS n;
+INSERT INTO {SCHEMA}.gw_user_role (role, gwuser_id, created_on)
+SELECT CASE WHEN random() < 0.01 THEN 'admin' ELSE 'user' END, id, created_on
+FROM {SCHEMA}.gw_user;
+"""
+
+INDEXES = f"""
+CREATE INDEX ix_gw_user_role_gwuser_id ON {SCHEMA}.gw_user_role (gwuser_id);
+CREATE UNIQUE INDEX uq_gw_user_email_lower ON {SCHEMA}.gw_user (lower(email));
+CREATE INDEX ix_gw_user_created_on_id ON {SCHEMA}.gw_user (created_on, id);
+CREATE INDEX ix_gw_user_live_created_on_id ON {SCHEMA}.gw_user
+    (created_on, id) WHERE NOT deleted;
+CREATE INDEX ix_gw_user_active_created_on_id ON {SCHEMA}.gw_user
+    (created_on, id) WHERE active AND NOT deleted;
+"""
+
+QUERIES = {
+    "get_by_email": (
+        f"SELECT * FROM {SCHEMA}.gw_user"
+        " WHERE lower(email) = lower(:email) LIMIT 1"
+    ),
+    "roles of a user": (
+        f"SELECT * FROM {SCHEMA}.gw_user_role WHERE gwuser_id = :user_id"
+        " ORDER BY created_on"
+    ),
+    "first page": (
+        f"SELECT * FROM {SCHEMA}.gw_user ORDER BY created_on, id LIMIT 50"
+    ),
+    "active users page": (
+        f"SELECT * FROM {SCHEMA}.gw_user WHERE active AND NOT deleted"
+        " AND (created_on, id) > (:created_on, :user_id)"
+        " ORDER BY created_on, id LIMIT 50"
+    ),
+}
+
+
+def explain_and_time(connection, runs: int, params: dict):
+    """Print the plan and the median time of every hot query."""
+    for name, query in QUERIES.items():
+        plan = connection.execute(
+            text(f"EXPLAIN (ANALYZE, COSTS OFF, TIMING OFF) {query}"), params
+        ).scalars()
+        timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            connection.execute(text(query), params).all()
+            timings.append(time.perf_counter() - started)
+        print(f"--- {name}: {statistics.median(timings) * 1e3:.3f} ms")
+        for line in plan:
+            print(f"    {line}")
+
+
+def main():
+    """Seed the scratch tables and compare the plans around the indexes."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1000000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument(
+        "--database-url", default=os.environ.get("SQL_ALCHEMY_DATABASE_URI")
+    )
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        connection.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        connection.execute(text(TABLES))
+        started = time.perf_counter()
+        connection.execute(text(SEED), {"users": args.users})
+        elapsed = time.perf_counter() - started
+        print(f"seeded {args.users} users in {elapsed:.1f}s")
+    try:
+        with engine.begin() as connection:
+            connection.execute(text(f"ANALYZE {SCHEMA}.gw_user"))
+            connection.execute(text(f"ANALYZE {SCHEMA}.gw_user_role"))
+            sample = connection.execute(
+                text(
+                    f"SELECT id, email, created_on FROM {SCHEMA}.gw_user"
+                    " ORDER BY created_on OFFSET :middle LIMIT 1"
+                ),
+                {"middle": args.users // 2},
+            ).one()
+            params = {
+                "email": sample.email.upper(),
+                "user_id": sample.id,
+                "created_on": sample.created_on,
+            }
+
+            print("\n=== before the indexes")
+            explain_and_time(connection, args.runs, params)
+
+            started = time.perf_counter()
+            connection.execute(text(INDEXES))
+            connection.execute(text(f"ANALYZE {SCHEMA}.gw_user"))
+            connection.execute(text(f"ANALYZE {SCHEMA}.gw_user_role"))
+            print(f"\nindexes built in {time.perf_counter() - started:.1f}s")
+
+            print("\n=== after the indexes")
+            explain_and_time(connection, args.runs, params)
+    finally:
+        with engine.begin() as connection:
+            connection.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Compare the inserts of random UUIDv4 and time-ordered UUIDv7 keys.
+
+Each version fills its own table of a scratch schema by batches, like the
+signups do, then the insert rate, the size of the primary key index and
+the density of its leaf pages are printed (the density needs the
+pgstattuple extension). The scratch schema is dropped at the end.
+
+Usage:
+    python -m benchmarks.uuid_inserts [--rows 1000000] [--batch 1000]
+        [--database-url postgresql://...]
+"""
+
+import argparse
+import os
+import time
+import uuid
+
+from sqlalchemy import create_engine, text
+
+from core.common.ids import uuid7
+
+SCHEMA = "bench_uuid_inserts"
+GENERATORS = {"v4": uuid.uuid4, "v7": uuid7}
+
+
+def fill(connection, table: str, generate, rows: int, batch: int) -> float:
+    """Insert rows by batches and give the number of rows per second."""
+    insert = text(
+        f"INSERT INTO {SCHEMA}.{table} (id, created_on)"
+        " VALUES (:id, clock_timestamp())"
+    )
+    started = time.perf_counter()
+    for offset in range(0, rows, batch):
+        connection.execute(
+            insert,
+            [{"id": generate()} for _ in range(min(batch, rows - offset))],
+        )
+        connection.commit()
+    return rows / (time.perf_counter() - started)
+
+
+def leaf_density(connection, index: str):
+    """Give the average fill of the leaf pages of an index, None if unknown."""
+    try:
+        with connection.begin_nested():
+            return connection.execute(
+                text("SELECT avg_leaf_density FROM pgstatindex(:index)"),
+                {"index": index},
+            ).scalar()
+    except Exception:
+        return None
+
+
+def main():
+    """Fill a table per UUID version and print their insert statistics."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument(
+        "--database-url", default=os.environ.get("SQL_ALCHEMY_DATABASE_URI")
+    )
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    with engine.connect() as connection:
+        connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        connection.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        connection.commit()
+        try:
+            print(
+                f"{'version':<9}{'rows/s':>10}{'index MB':>10}"
+                f"{'bytes/row':>11}{'leaf density %':>16}"
+            )
+            for version, generate in GENERATORS.items():
+                table = f"users_{version}"
+                connection.execute(
+                    text(
+                        f"CREATE TABLE {SCHEMA}.{table} ("
+                        " id uuid PRIMARY KEY,"
+                        " created_on timestamp NOT NULL)"
+                    )
+                )
+                connection.commit()
+                rate = fill(connection, table, generate, args.rows, args.batch)
+                index = f"{SCHEMA}.{table}_pkey"
+                size = connection.execute(
+                    text("SELECT pg_relation_size(CAST(:index AS regclass))"),
+                    {"index": index},
+                ).scalar()
+                density = leaf_density(connection, index)
+                print(
+                    f"{version:<9}{rate:>10.0f}{size / 2**20:>10.1f}"
+                    f"{size / args.rows:>11.1f}"
+                    f"{'n/a' if density is None else f'{density:.1f}':>16}"
+                )
+        finally:
+            connection.rollback()
+            connection.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+            connection.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,8 @@ Raises:
     Exception: Raise an error if the .env file does not exist.
 """
 
+import json
+from os import cpu_count
 from os import environ as env
 from os.path import abspath, dirname, join
 
@@ -41,8 +43,34 @@ ADMINS = env.get("ADMINS")
 MAIL_USE_TLS = True
 MAIL_DEBUG = env.get("MAIL_DEBUG") == "True"
 
+# Resolution of the email domains
+EMAIL_DOMAIN_CACHE_MAX_SIZE = 10000
+EMAIL_DOMAIN_POSITIVE_TTL = 3600
+EMAIL_DOMAIN_NEGATIVE_TTL = 300
+EMAIL_DOMAIN_RESOLVER_WORKERS = 8
+EMAIL_DOMAIN_RESOLVER_TIMEOUT = 5
+EMAIL_PREWARM_DOMAINS = env.get(
+    "EMAIL_PREWARM_DOMAINS",
+    "gmail.com,googlemail.com,outlook.com,hotmail.com,live.com,yahoo.com,"
+    "icloud.com,me.com,aol.com,proton.me,protonmail.com,gmx.com,mail.com",
+).split(",")
+
 # pagination
 ITEMS_PER_PAGE = 10
+MAX_ITEMS_PER_PAGE = 100
+# Rows fetched at once by the streamed listings
+STREAM_BATCH_SIZE = 1000
+# Characters encoded at once by the users exports
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+# Maximum number of tokens introspected by a single batch call
+INTROSPECTION_MAX_TOKENS = 100
+# Permission needed to introspect the tokens of other users, it must be
+# granted by ROLE_PERMISSIONS to the roles of the calling services.
+INTROSPECTION_PERMISSION = "tokens:introspect"
+
+# Lifetime (in seconds) of the decisions of the forward authentication
+FORWARD_AUTH_CACHE_TTL = 5
 
 DEBUG = False
 
@@ -54,6 +82,15 @@ JWT_ALG = env.get("JWT_ALG")
 JWT_ENCODING_PARAM_1 = env.get("JWT_ENCODING_PARAM_1")
 JWT_ENCODING_PARAM_2 = env.get("JWT_ENCODING_PARAM_2")
 JWT_ENCODING_PARAM_3 = env.get("JWT_ENCODING_PARAM_3")
+# PEM keys used when JWT_ALG is asymmetric (EdDSA, RS256, ...).
+JWT_PRIVATE_KEY_FILE = env.get("JWT_PRIVATE_KEY_FILE")
+JWT_PUBLIC_KEY_FILE = env.get("JWT_PUBLIC_KEY_FILE")
+JWKS_MAX_AGE = 3600
+# Optional JSON key ring allowing the rotation of the signing keys.
+JWT_KEYRING_FILE = env.get("JWT_KEYRING_FILE")
+# Longest lifetimes (in seconds) of the tokens, retired keys are kept as long.
+JWT_SESSION_MAX_AGE = 30 * 60
+ACTIVATION_TOKEN_MAX_AGE = 3600
 
 ################################################################
 # ### loading configurations for external services from here ###
@@ -76,8 +113,70 @@ RULE_PASSWORD_WITH_UPPERCASE = env.get("RULE_PASSWORD_WITH_UPPERCASE")
 RULE_PASSWORD_MIN_LENGTH = env.get("RULE_PASSWORD_MIN_LENGTH")
 RULE_PASSWORD_MAX_LENGTH = env.get("RULE_PASSWORD_MAX_LENGTH")
 RULE_PASSWORD_MIN_STRENGTH_SCORE = env.get("RULE_PASSWORD_MIN_STRENGTH_SCORE")
+# "remote" calls the scoring api, "local" scores the passwords in-process.
+PASSWORD_SCORING_MODE = env.get("PASSWORD_SCORING_MODE", "remote")
+# Optional word list (one per line) extending the local weak words dictionary.
+PASSWORD_DICTIONARY_FILE = env.get("PASSWORD_DICTIONARY_FILE")
+# Optional index of breached password hashes, see breached_passwords.py.
+BREACHED_PASSWORDS_FILE = env.get("BREACHED_PASSWORDS_FILE")
+BREACHED_PASSWORDS_MIN_COUNT = int(env.get("BREACHED_PASSWORDS_MIN_COUNT", 1))
 
 # Resilient pattern params for external APIs and WS
 CIRCUIT_BREAK_MAX_FAIL = 5
 CIRCUIT_BREAK_RESET_TIMEOUT = 120
 RETRY_CALLS = 3
+
+# Pool of processes hashing the passwords, full beyond HASHING_MAX_PENDING
+HASHING_WORKERS = int(env.get("HASHING_WORKERS", cpu_count() or 1))
+HASHING_MAX_PENDING = int(env.get("HASHING_MAX_PENDING", HASHING_WORKERS * 4))
+
+# Policy of the new password hashes, see core/auth/hash_policy.py. The
+# hashes of another policy are upgraded on the next successful login.
+PASSWORD_HASH_METHOD = env.get("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+
+# Version of the new users ids: 7 (time-ordered, the default) or 4 (random).
+# Both coexist in the table, going back to 4 needs no migration.
+USER_ID_VERSION = int(env.get("USER_ID_VERSION", 7))
+
+# Rows per batch of the bulk imports of users (flask users import)
+IMPORT_BATCH_SIZE = int(env.get("IMPORT_BATCH_SIZE", 5000))
+
+# Concurrent validation of the accounts: threads and deadline (in seconds)
+VALIDATION_POOL_SIZE = int(env.get("VALIDATION_POOL_SIZE", 16))
+VALIDATION_DEADLINE = float(env.get("VALIDATION_DEADLINE", 10))
+# The longest address SMTP can deliver to (RFC 5321).
+EMAIL_MAX_LENGTH = 254
+
+# Connection pool of the password scoring api
+SCORING_POOL_SIZE = int(env.get("SCORING_POOL_SIZE", 10))
+SCORING_CONNECT_TIMEOUT = float(env.get("SCORING_CONNECT_TIMEOUT", 1.0))
+SCORING_READ_TIMEOUT = float(env.get("SCORING_READ_TIMEOUT", 5.0))
+SCORING_KEEP_ALIVE = env.get("SCORING_KEEP_ALIVE", "True") == "True"
+
+# Roles known to the gateway, each one owning a bit of the roles masks in the
+# order of the list: append the new roles, never reorder or remove any.
+ROLES = [
+    role.strip()
+    for role in env.get("ROLES", "admin,user").split(",")
+    if role.strip()
+]
+# JSON objects of the roles directly included by a role, and of the
+# permissions directly granted by a role. Every role they name must be in
+# ROLES, e.g. with ROLES=admin,user,editor,viewer
+# ROLE_INHERITANCE={"admin": ["editor"], "editor": ["viewer"]}
+# ROLE_PERMISSIONS={"viewer": ["users:read"], "editor": ["users:write"]}
+# The permissions required by the routes must be granted to some role.
+ROLE_INHERITANCE = json.loads(env.get("ROLE_INHERITANCE", "{}"))
+ROLE_PERMISSIONS = json.loads(
+    env.get(
+        "ROLE_PERMISSIONS", json.dumps({"admin": [INTROSPECTION_PERMISSION]})
+    )
+)
+
+# In-process caches
+JWT_CACHE_MAX_SIZE = 10000
+USER_STATE_CACHE_MAX_SIZE = 10000
+USER_STATE_CACHE_TTL = 30
+IDENTITY_CACHE_MAX_SIZE = int(env.get("IDENTITY_CACHE_MAX_SIZE", 10000))
+IDENTITY_CACHE_TTL = int(env.get("IDENTITY_CACHE_TTL", 60))
+FORWARD_AUTH_CACHE_MAX_SIZE = 10000
@@ -1,11 +1,12 @@
 """Declare the module of the application."""
 
+import threading
+
 from flask import Flask
 from flask_login import LoginManager
 from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
 
-from core.users import users_bp
 from server.config.logs import configure_logging
 from server.config.mails import mail
 
@@ -24,8 +25,12 @@ def register_blueprints(app):
         app: the flask app.
     """
     # Registro de los Blueprints
+    # Imported here as the blueprints depend on the extensions declared above.
+    from core.tokens import tokens_bp
+    from core.users.routes import users_bp
 
     app.register_blueprint(users_bp)
+    app.register_blueprint(tokens_bp)
 
 
 def create_app(settings_module="config.DevelopmentConfig"):
@@ -55,11 +60,80 @@ def create_app(settings_module="config.DevelopmentConfig"):
     # Custom error handlers
     register_error_handlers(app)
 
+    register_commands(app)
+
+    register_prewarm(app)
+
     return app
 
 
+def create_forward_auth_app(settings_module="config.DevelopmentConfig"):
+    """Create a stripped-down application only serving the tokens endpoints.
+
+    Meant to run as the external authorizer of a reverse proxy, it skips
+    Flask-Login, Flask-Mail, the migrations and the users blueprint.
+
+    Returns:
+        app: the flask application.
+    """
+    app = Flask(__name__, instance_relative_config=True)
+    app.config.from_object(settings_module)
+
+    configure_logging(app)
+
+    db.init_app(app)
+
+    from core.tokens import tokens_bp
+
+    app.register_blueprint(tokens_bp)
+
+    register_error_handlers(app)
+
+    return app
+
+
+def register_commands(app):
+    """Register the flask commands of the modules.
+
+    Args:
+        app (_type_): the flask app.
+    """
+    from core.auth.commands import passwords_cli
+    from core.users.commands import users_cli
+
+    app.cli.add_command(passwords_cli)
+    app.cli.add_command(users_cli)
+
+
+def register_prewarm(app):
+    """Resolve the most common email domains before the first signups.
+
+    Started by the first request, so the flask commands and the benchmarks
+    creating the app never send these lookups.
+
+    Args:
+        app (_type_): the flask app.
+    """
+    prewarmed = threading.Event()
+
+    @app.before_request
+    def prewarm_email_domains():
+        if not prewarmed.is_set():
+            prewarmed.set()
+            from core.services.validators.email_domains import (
+                domain_resolver,
+            )
+
+            domain_resolver.prewarm()
+
+
 def register_error_handlers(app):
     """Add custom error handlers to the app."""
+    from core.auth.hashing import HashingPoolSaturated
+
+    @app.errorhandler(HashingPoolSaturated)
+    def hashing_saturated_handler(e):
+        return {"message": "Service Unavailable Error 503 !!!"}, 503
 
     @app.errorhandler(500)
     def base_error_handler(e):
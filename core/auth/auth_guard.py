@@ -1,17 +1,16 @@
 """Define all the decorators relative to users privileges and rights on the endpoint calls."""
 
 from functools import wraps
+from typing import NamedTuple
 
 from flask import abort, jsonify
 from flask_login import current_user
 
-from config.default import JWT_ENCODING_PARAM_1, JWT_ENCODING_PARAM_2
-from core.auth.generic_encoder_decoder import (
-    decode_as_base64,
-    encode_as_base64,
-)
-from core.auth.jwt.jwt_handler import check_jwt, extract_jwt
+from core.auth.jwt.claims import Claims, decode_claims, encode_user_id
+from core.auth.jwt.jwt_handler import decode_jwt, extract_jwt
+from core.auth.roles import Requirement, role_registry
 from core.common.error_codes import (
+    __RESPONSE_STATUS_200,
     __RESPONSE_STATUS_401,
     __RESPONSE_STATUS_403,
 )
@@ -22,10 +21,7 @@ from core.common.messages import (
     __AUTH_REQUIRED,
     __LOGIN_MSG,
 )
-from core.users.models import GwUser
-
-JWT_ENCODING_PARAM_1 = JWT_ENCODING_PARAM_1
-JWT_ENCODING_PARAM_2 = JWT_ENCODING_PARAM_2
+from core.users.models import GwUser, UserState
 
 
 def admin_required(f):
@@ -41,75 +37,114 @@ def admin_required(f):
     return decorated_function
 
 
-def auth_guard(role=None):
+class AuthDecision(NamedTuple):
+    """Declare the outcome of the authentication and authorization gates."""
+
+    status: int
+    message: str
+    error: str
+    claims: Claims
+    state: UserState
+
+
+def authorize(token: str, requirement: Requirement = None) -> AuthDecision:
+    """Run the authentication and authorization gates for a jwt.
+
+    Args:
+        token (str): the bearer jwt.
+        requirement (Requirement, optional): the roles and permissions the user must have, see role_registry.require. Defaults to None.
+
+    Returns:
+        AuthDecision: the status code, messages, claims and state of the user.
+    """
+    # Authentication gate
+    try:
+        claims = decode_claims(decode_jwt(token))
+    except Exception as e:
+        return AuthDecision(
+            __RESPONSE_STATUS_401,
+            __LOGIN_MSG,
+            f"Invalid access token: {e}",
+            None,
+            None,
+        )
+
+    user_state = GwUser.get_state_by_id(claims.user_id)
+    if user_state is None or not user_state.can_authenticate:
+        return AuthDecision(
+            __RESPONSE_STATUS_401,
+            __ACTIVATION_REQUIRED,
+            __ACTIVATION_MSG,
+            claims,
+            user_state,
+        )
+
+    # Authorization gate
+    if requirement and not role_registry.allows(
+        claims.role_mask | user_state.role_mask, requirement
+    ):
+        return AuthDecision(
+            __RESPONSE_STATUS_403,
+            __AUTH_REQUIRED,
+            __ACCESS_DENIED,
+            claims,
+            user_state,
+        )
+
+    return AuthDecision(__RESPONSE_STATUS_200, "", "", claims, user_state)
+
+
+def auth_guard(role=None, permission=None):
     """Define the decorator function that will handle the authentication validation via JWT.
 
     Args:
-        role (str, optional): Indicate the role of the user. Defaults to None.
+        role (str, optional): Indicate the role of the user, held directly or inherited. Defaults to None.
+        permission (str, optional): Indicate the permission one of the roles of the user must grant. Defaults to None.
     """
+    # An unknown role or permission fails when the route is declared.
+    requirement = role_registry.require(
+        (role,) if role else (), (permission,) if permission else ()
+    )
 
     def wrapper(route_function):
         def decorated_function(*args, **kwargs):
-            # Authentication gate
             try:
-                user_data = check_jwt()
+                token = extract_jwt()
             except Exception as e:
-                return (
-                    jsonify(
-                        {
-                            "error": f"{e}",
-                            "message": __LOGIN_MSG,
-                            "status": __RESPONSE_STATUS_401,
-                            "data": "",
-                        }
-                    ),
-                    __RESPONSE_STATUS_401,
+                decision = AuthDecision(
+                    __RESPONSE_STATUS_401, __LOGIN_MSG, f"{e}", None, None
                 )
+            else:
+                decision = authorize(token, requirement)
 
-            if not GwUser.is_active_user_by_id(
-                decode_as_base64(
-                    user_data[encode_as_base64(JWT_ENCODING_PARAM_1)]
-                )
-            ):
+            if decision.status == __RESPONSE_STATUS_403:
                 return (
                     jsonify(
                         {
-                            "message": __ACTIVATION_REQUIRED,
-                            "status": __RESPONSE_STATUS_401,
-                            "data": "",
-                            "error": __ACTIVATION_MSG,
+                            "message": decision.message,
+                            "status": decision.status,
+                            "data": {
+                                "user": encode_user_id(
+                                    decision.claims.user_id
+                                ),
+                                "jwt": token,
+                            },
+                            "error": decision.error,
                         }
                     ),
-                    __RESPONSE_STATUS_401,
-                )
-
-            # Authorization gate
-            if (
-                role
-                and role
-                not in user_data[encode_as_base64(JWT_ENCODING_PARAM_2)]
-                and role
-                not in GwUser.get_user_roles_by_id(
-                    decode_as_base64(
-                        user_data[encode_as_base64(JWT_ENCODING_PARAM_1)]
-                    )
+                    decision.status,
                 )
-            ):
+            if decision.status != __RESPONSE_STATUS_200:
                 return (
                     jsonify(
                         {
-                            "message": __AUTH_REQUIRED,
-                            "status": __RESPONSE_STATUS_403,
-                            "data": {
-                                "user": user_data[
-                                    encode_as_base64(JWT_ENCODING_PARAM_1)
-                                ],
-                                "jwt": extract_jwt(),
-                            },
-                            "error": __ACCESS_DENIED,
+                            "message": decision.message,
+                            "status": decision.status,
+                            "data": "",
+                            "error": decision.error,
                         }
                     ),
-                    __RESPONSE_STATUS_403,
+                    decision.status,
                 )
 
             # Proceed to original route function
@@ -0,0 +1,33 @@
+"""Declare the command line of the authentication module."""
+
+import click
+from flask.cli import AppGroup
+
+from config.default import PASSWORD_HASH_METHOD
+from core.auth.hash_policy import calibrate
+
+passwords_cli = AppGroup("passwords", help="Manage the passwords hashing.")
+
+
+@passwords_cli.command("calibrate")
+@click.option(
+    "--algorithm",
+    type=click.Choice(["argon2id", "scrypt", "pbkdf2"]),
+    default="scrypt",
+    show_default=True,
+)
+@click.option(
+    "--target-ms",
+    type=float,
+    default=250,
+    show_default=True,
+    help="The targeted verification time of a password in milliseconds.",
+)
+@click.option("--rounds", type=int, default=3, show_default=True)
+def calibrate_command(algorithm, target_ms, rounds):
+    """Suggest the PASSWORD_HASH_METHOD verifying in about TARGET_MS."""
+    click.echo(f"Current policy: {PASSWORD_HASH_METHOD}")
+    suggestion, measures = calibrate(algorithm, target_ms, rounds)
+    for method, elapsed in measures:
+        click.echo(f"{method:<32}{elapsed:>10.1f} ms")
+    click.echo(f"PASSWORD_HASH_METHOD={suggestion}")
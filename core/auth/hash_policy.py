@@ -0,0 +1,183 @@
+"""Define the policies hashing the passwords.
+
+A policy is a method string naming the algorithm and its cost:
+    scrypt:N:r:p             e.g. scrypt:32768:8:1
+    pbkdf2:hash:iterations   e.g. pbkdf2:sha256:600000
+    argon2id:t:m:p           e.g. argon2id:3:65536:4 (memory m in KiB)
+The scrypt and pbkdf2 policies are computed by werkzeug, the argon2id one
+needs the optional argon2-cffi package. Every stored hash remembers the
+policy it was computed with, so the stale ones are rehashed on login.
+"""
+
+import statistics
+import time
+
+from werkzeug.security import (
+    DEFAULT_PBKDF2_ITERATIONS,
+    check_password_hash,
+    generate_password_hash,
+)
+
+try:
+    from argon2 import PasswordHasher, Type
+    from argon2.exceptions import InvalidHashError, VerificationError
+except ImportError:  # pragma: no cover - optional dependency
+    PasswordHasher = None
+
+ARGON2_PREFIX = "$argon2"
+ARGON2_DEFAULTS = (3, 65536, 4)
+SCRYPT_DEFAULTS = (2**15, 8, 1)
+
+
+def _argon2_hasher(method: str):
+    """Build the argon2id hasher of a policy."""
+    if PasswordHasher is None:
+        raise Exception(
+            f"The password hash policy {method} needs argon2-cffi !"
+        )
+    time_cost, memory_cost, parallelism = normalize_method(method).split(":")[
+        1:
+    ]
+    return PasswordHasher(
+        time_cost=int(time_cost),
+        memory_cost=int(memory_cost),
+        parallelism=int(parallelism),
+        type=Type.ID,
+    )
+
+
+def normalize_method(method: str) -> str:
+    """Complete a policy with the default costs of its algorithm.
+
+    Args:
+        method (str): the policy, possibly missing some costs.
+
+    Raises:
+        Exception: The algorithm of the policy is not supported.
+
+    Returns:
+        str: the policy with every cost, as stored in front of the hashes.
+    """
+    algorithm, *costs = method.split(":")
+    if algorithm == "scrypt":
+        defaults = SCRYPT_DEFAULTS
+    elif algorithm == "pbkdf2":
+        defaults = ("sha256", DEFAULT_PBKDF2_ITERATIONS)
+    elif algorithm == "argon2id":
+        defaults = ARGON2_DEFAULTS
+    else:
+        raise Exception(f"Unsupported password hash policy {method} !")
+    costs = costs + [str(value) for value in defaults[len(costs) :]]
+    return ":".join([algorithm, *costs])
+
+
+def make_hash(password: str, method: str) -> str:
+    """Hash a password with a policy.
+
+    Args:
+        password (str): the password to hash.
+        method (str): the policy.
+
+    Returns:
+        str: the hash of the password.
+    """
+    if method.startswith("argon2id"):
+        return _argon2_hasher(method).hash(password)
+    return generate_password_hash(password, method=method)
+
+
+def verify_hash(password_hash: str, password: str) -> bool:
+    """Check a password against a hash of any supported policy.
+
+    Args:
+        password_hash (str): the stored hash.
+        password (str): the password to check.
+
+    Returns:
+        bool: True if the password matches the hash, False otherwise.
+    """
+    if password_hash.startswith(ARGON2_PREFIX):
+        try:
+            # The costs are read from the hash itself.
+            return _argon2_hasher("argon2id").verify(password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+    return check_password_hash(password_hash, password)
+
+
+def needs_rehash(password_hash: str, method: str) -> bool:
+    """Tell if a hash was computed with another policy.
+
+    Args:
+        password_hash (str): the stored hash.
+        method (str): the current policy.
+
+    Returns:
+        bool: True if the password should be hashed again, False otherwise.
+    """
+    if method.startswith("argon2id"):
+        return not password_hash.startswith(ARGON2_PREFIX) or _argon2_hasher(
+            method
+        ).check_needs_rehash(password_hash)
+    return password_hash.split("$", 1)[0] != normalize_method(method)
+
+
+def measure(method: str, rounds: int = 3) -> float:
+    """Measure the time taken to verify a password with a policy.
+
+    Args:
+        method (str): the policy to measure.
+        rounds (int, optional): the number of verifications. Defaults to 3.
+
+    Returns:
+        float: the median verification time in milliseconds.
+    """
+    password_hash = make_hash("calibration-password", method)
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        verify_hash(password_hash, "calibration-password")
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate(algorithm: str, target_ms: float, rounds: int = 3) -> tuple:
+    """Search the cost of an algorithm verifying in about target_ms.
+
+    The cost grows with the iterations of pbkdf2, the passes of argon2id
+    and the power of two N of scrypt; the memory and parallelism costs stay
+    at their defaults.
+
+    Args:
+        algorithm (str): scrypt, pbkdf2 or argon2id.
+        target_ms (float): the targeted verification time in milliseconds.
+        rounds (int, optional): the verifications per measure. Defaults to 3.
+
+    Returns:
+        tuple: the suggested policy and the list of the (policy, milliseconds) measured.
+    """
+    if algorithm == "scrypt":
+        _, r, p = SCRYPT_DEFAULTS
+        candidates = (f"scrypt:{2**log_n}:{r}:{p}" for log_n in range(10, 24))
+    elif algorithm == "pbkdf2":
+        candidates = (
+            f"pbkdf2:sha256:{iterations}"
+            for iterations in (50000 * 2**step for step in range(12))
+        )
+    else:
+        _, memory_cost, parallelism = ARGON2_DEFAULTS
+        candidates = (
+            f"argon2id:{time_cost}:{memory_cost}:{parallelism}"
+            for time_cost in range(1, 33)
+        )
+
+    measures = []
+    for method in candidates:
+        measures.append((method, measure(method, rounds)))
+        if measures[-1][1] >= target_ms:
+            break
+    # The closest of the last two costs around the target.
+    suggestion = min(
+        measures[-2:], key=lambda measured: abs(measured[1] - target_ms)
+    )
+    return suggestion[0], measures
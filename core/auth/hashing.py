@@ -0,0 +1,177 @@
+"""Run the password hashing on a bounded pool of processes.
+
+The hashing functions are deliberately CPU-expensive, running them on the
+request threads holds the GIL and blocks the worker. They are sent to a
+pool of processes instead, whose queue is bounded: when it is full the call
+fails fast with HashingPoolSaturated, answered with a 503.
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from config.default import (
+    HASHING_MAX_PENDING,
+    HASHING_WORKERS,
+    PASSWORD_HASH_METHOD,
+)
+from core.auth.hash_policy import make_hash, needs_rehash, verify_hash
+
+
+class HashingPoolSaturated(Exception):
+    """Declare the error raised when too many hashes are already queued."""
+
+
+class HashingExecutor:
+    """Declare the bounded pool of processes computing the hashes."""
+
+    def __init__(self, max_workers: int, max_pending: int):
+        """Declare constructor for the executor.
+
+        Args:
+            max_workers (int): the number of processes of the pool.
+            max_pending (int): the maximum number of hashes queued or running.
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        """Give the pool of the current process, started on first use.
+
+        Returns:
+            ProcessPoolExecutor: the pool of processes.
+        """
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    # Spawned processes do not inherit the sockets and the
+                    # threads of the application.
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                    self._pid = os.getpid()
+        return self._executor
+
+    def run(self, function, *args):
+        """Compute a hash on the pool and wait for it.
+
+        Args:
+            function (callable): the picklable hashing function.
+            *args: the arguments of the function.
+
+        Raises:
+            HashingPoolSaturated: max_pending hashes are already queued or running.
+
+        Returns:
+            any: the result of the function.
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HashingPoolSaturated("The password hashing pool is full !")
+
+        started = time.perf_counter()
+        with self._lock:
+            self.pending += 1
+        executor = self.executor
+        try:
+            return executor.submit(function, *args).result()
+        except BrokenProcessPool:
+            # A dead process breaks the pool, the next call starts a new one.
+            with self._lock:
+                # The concurrent calls share the broken pool, release it once.
+                if self._executor is executor:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    self._pid = None
+            raise
+        finally:
+            latency = time.perf_counter() - started
+            with self._lock:
+                self.pending -= 1
+                self.completed += 1
+                self.total_latency += latency
+                self.max_latency = max(self.max_latency, latency)
+            self._slots.release()
+
+    def stats(self) -> dict:
+        """Describe the usage of the pool.
+
+        Returns:
+            dict: the queue depth and bound, the hashes completed and rejected, and the hashing latencies in milliseconds.
+        """
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "pending": self.pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "latency_avg_ms": (
+                    self.total_latency / self.completed * 1000
+                    if self.completed
+                    else 0.0
+                ),
+                "latency_max_ms": self.max_latency * 1000,
+            }
+
+
+hashing_executor = HashingExecutor(
+    max_workers=HASHING_WORKERS, max_pending=HASHING_MAX_PENDING
+)
+
+
+def hash_password(password: str) -> str:
+    """Hash a password on the hashing pool with PASSWORD_HASH_METHOD.
+
+    Args:
+        password (str): the password to hash.
+
+    Raises:
+        HashingPoolSaturated: the hashing pool is full.
+
+    Returns:
+        str: the hash of the password.
+    """
+    return hashing_executor.run(make_hash, password, PASSWORD_HASH_METHOD)
+
+
+def verify_password(password_hash: str, password: str) -> bool:
+    """Check a password against its hash on the hashing pool.
+
+    Args:
+        password_hash (str): the stored hash.
+        password (str): the password to check.
+
+    Raises:
+        HashingPoolSaturated: the hashing pool is full.
+
+    Returns:
+        bool: True if the password matches the hash, False otherwise.
+    """
+    return hashing_executor.run(verify_hash, password_hash, password)
+
+
+def password_needs_rehash(password_hash: str) -> bool:
+    """Tell if a hash was computed with an outdated policy.
+
+    Args:
+        password_hash (str): the stored hash.
+
+    Returns:
+        bool: True if the hash does not follow PASSWORD_HASH_METHOD.
+    """
+    return needs_rehash(password_hash, PASSWORD_HASH_METHOD)
@@ -0,0 +1,113 @@
+"""Define the compact encoding of the claims carried by the session jwt."""
+
+import base64
+import uuid
+from typing import NamedTuple
+
+from core.auth.roles import role_registry
+
+CLAIM_USER_ID = "uid"
+CLAIM_ROLES = "rol"
+CLAIM_EMAIL = "eml"
+
+ROLES_SEPARATOR = ","
+
+
+class Claims(NamedTuple):
+    """Declare the identity claims decoded from a session jwt."""
+
+    user_id: uuid.UUID
+    role_mask: int
+    email: str
+    expires_at: float
+
+
+def encode_user_id(user_id) -> str:
+    """Encode a user id as the unpadded base64url form of its 16 bytes.
+
+    Args:
+        user_id (UUID | str): the id of the user.
+
+    Returns:
+        str: the 22 characters encoded id.
+    """
+    if not isinstance(user_id, uuid.UUID):
+        user_id = uuid.UUID(str(user_id))
+    return base64.urlsafe_b64encode(user_id.bytes).rstrip(b"=").decode()
+
+
+def decode_user_id(value: str) -> uuid.UUID:
+    """Decode a user id encoded by encode_user_id.
+
+    Args:
+        value (str): the encoded id.
+
+    Returns:
+        UUID: the id of the user.
+    """
+    return uuid.UUID(bytes=base64.urlsafe_b64decode(value + "=="))
+
+
+def encode_roles(roles) -> str:
+    """Encode a list of roles as a single separated string (first tokens).
+
+    Args:
+        roles (iterable): the names of the roles.
+
+    Returns:
+        str: the encoded roles.
+    """
+    return ROLES_SEPARATOR.join(roles)
+
+
+def decode_roles(value: str) -> frozenset:
+    """Decode the roles encoded by encode_roles.
+
+    Args:
+        value (str): the encoded roles.
+
+    Returns:
+        frozenset: the names of the roles.
+    """
+    return frozenset(value.split(ROLES_SEPARATOR)) if value else frozenset()
+
+
+def encode_claims(user_id, roles, email: str = None) -> dict:
+    """Build the payload of a session jwt.
+
+    Args:
+        user_id (UUID): the id of the user.
+        roles (iterable): the names of the roles of the user, compiled into their mask.
+        email (str, optional): the email of the user. Defaults to None.
+
+    Returns:
+        dict: the claims to sign.
+    """
+    claims = {
+        CLAIM_USER_ID: encode_user_id(user_id),
+        CLAIM_ROLES: role_registry.mask(roles),
+    }
+    if email:
+        claims[CLAIM_EMAIL] = email
+    return claims
+
+
+def decode_claims(payload: dict) -> Claims:
+    """Read the identity claims of a verified jwt payload.
+
+    Args:
+        payload (dict): the payload returned by decode_jwt.
+
+    Returns:
+        Claims: the id, roles mask and email of the user, and the token expiration.
+    """
+    role_mask = payload.get(CLAIM_ROLES, 0)
+    if isinstance(role_mask, str):
+        # Tokens issued before the roles masks.
+        role_mask = role_registry.mask(decode_roles(role_mask))
+    return Claims(
+        user_id=decode_user_id(payload[CLAIM_USER_ID]),
+        role_mask=role_mask,
+        email=payload.get(CLAIM_EMAIL),
+        expires_at=payload.get("exp"),
+    )
@@ -0,0 +1,21 @@
+"""Build the JSON Web Key Set published to the services behind the gateway."""
+
+import hashlib
+import json
+
+
+def build_jwks_document(signing_keys) -> tuple:
+    """Serialize the public keys as a JWKS document.
+
+    Args:
+        signing_keys (iterable): the SigningKey to publish, HMAC keys are skipped.
+
+    Returns:
+        tuple: the JSON body as bytes and its strong ETag.
+    """
+    body = json.dumps(
+        {"keys": [key.public_jwk for key in signing_keys if key.public_jwk]},
+        separators=(",", ":"),
+        sort_keys=True,
+    ).encode()
+    return body, hashlib.sha256(body).hexdigest()
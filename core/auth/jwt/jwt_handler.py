@@ -1,10 +1,21 @@
 """Regroup the tools to manage the jwt."""
 
+import hashlib
+
 import arrow
 import jwt
 from flask import request
 
-from config.default import JWT_ALG, SECRET_KEY
+from config.default import JWT_CACHE_MAX_SIZE
+from core.auth.jwt.jwks import build_jwks_document
+from core.auth.keyring import session_key_ring
+from core.common.caches import TTLCache
+
+# JWKS document of the session key ring, rebuilt when keys are pruned.
+jwks_document = (None, None)
+
+# Payloads of the tokens already verified, keyed by the digest of the token.
+verified_tokens = TTLCache(max_size=JWT_CACHE_MAX_SIZE)
 
 
 def generate_jwt(payload, lifetime=None):
@@ -23,7 +34,13 @@ def generate_jwt(payload, lifetime=None):
             .shift(minutes=(0 if not lifetime else lifetime))
             .timestamp()
         )
-    return jwt.encode(payload, SECRET_KEY, algorithm=JWT_ALG)
+    session_key = session_key_ring.active_key
+    return jwt.encode(
+        payload,
+        session_key.signing_key,
+        algorithm=session_key.algorithm,
+        headers={"kid": session_key.kid} if session_key.kid else None,
+    )
 
 
 def decode_jwt(token):
@@ -35,7 +52,46 @@ def decode_jwt(token):
     Returns:
         json: The payload info if the JWT is valid. Will throw an error if the token is invalid (expired or inconsistent).
     """
-    return jwt.decode(token, SECRET_KEY, algorithms=[JWT_ALG])
+    key = hashlib.sha256(token.encode()).digest()
+    payload = verified_tokens.get(key)
+    if payload is None:
+        session_key = session_key_ring.get(
+            jwt.get_unverified_header(token).get("kid")
+        )
+        payload = jwt.decode(
+            token,
+            session_key.verifying_key,
+            algorithms=[session_key.algorithm],
+        )
+        # Tokens without expiration are never cached as they would never
+        # be evicted on time.
+        if "exp" in payload:
+            verified_tokens.set(key, payload, expires_at=payload["exp"])
+    return dict(payload)
+
+
+def get_jwt_cache_stats() -> dict:
+    """Describe the usage of the cache of verified tokens.
+
+    Returns:
+        dict: the size, hits, misses and hit ratio of the cache.
+    """
+    return verified_tokens.stats()
+
+
+def get_jwks_document() -> tuple:
+    """Give the JWKS document publishing the public session keys.
+
+    Returns:
+        tuple: the JSON body as bytes and its ETag.
+    """
+    global jwks_document
+    version, document = jwks_document
+    signing_keys = session_key_ring.keys()
+    if version != session_key_ring.version:
+        document = build_jwks_document(signing_keys)
+        jwks_document = (session_key_ring.version, document)
+    return document
 
 
 def extract_jwt():
@@ -0,0 +1,109 @@
+"""Load the keys used to sign and verify the jwt."""
+
+import base64
+import hashlib
+import json
+from typing import NamedTuple
+
+from cryptography.hazmat.primitives.serialization import (
+    load_pem_private_key,
+    load_pem_public_key,
+)
+from jwt.algorithms import get_default_algorithms
+
+ASYMMETRIC_ALGORITHMS = (
+    "EdDSA",
+    "RS256",
+    "RS384",
+    "RS512",
+    "PS256",
+    "PS384",
+    "PS512",
+    "ES256",
+    "ES384",
+    "ES512",
+)
+
+# Members of a public JWK hashed into its thumbprint (RFC 7638).
+THUMBPRINT_MEMBERS = {
+    "RSA": ("e", "kty", "n"),
+    "EC": ("crv", "kty", "x", "y"),
+    "OKP": ("crv", "kty", "x"),
+}
+
+
+class SigningKey(NamedTuple):
+    """Declare a key able to sign and verify the jwt."""
+
+    kid: str
+    algorithm: str
+    signing_key: object
+    verifying_key: object
+    public_jwk: dict
+
+
+def jwk_thumbprint(jwk: dict) -> str:
+    """Compute the RFC 7638 thumbprint of a public JWK.
+
+    Args:
+        jwk (dict): the public JWK.
+
+    Returns:
+        str: the unpadded base64url SHA-256 thumbprint.
+    """
+    members = {name: jwk[name] for name in THUMBPRINT_MEMBERS[jwk["kty"]]}
+    digest = hashlib.sha256(
+        json.dumps(members, separators=(",", ":"), sort_keys=True).encode()
+    ).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+def load_signing_key(
+    algorithm: str,
+    secret: str = None,
+    private_key_file: str = None,
+    public_key_file: str = None,
+    kid: str = None,
+) -> SigningKey:
+    """Build the signing key for an algorithm.
+
+    Asymmetric keys are parsed once from their PEM files so that signing and
+    verifying do not parse them again on every call.
+
+    Args:
+        algorithm (str): the jwt algorithm, e.g. HS256, RS256 or EdDSA.
+        secret (str, optional): the shared secret of the HMAC algorithms.
+        private_key_file (str, optional): the PEM private key of the asymmetric algorithms.
+        public_key_file (str, optional): the PEM public key, derived from the private key when missing.
+        kid (str, optional): the key id, defaults to the JWK thumbprint for asymmetric keys.
+
+    Raises:
+        Exception: The key material required by the algorithm is missing.
+
+    Returns:
+        SigningKey: the key to sign and verify the jwt.
+    """
+    if algorithm not in ASYMMETRIC_ALGORITHMS:
+        if not secret:
+            raise Exception(f"A secret is required to sign with {algorithm}")
+        return SigningKey(kid, algorithm, secret, secret, None)
+
+    if not private_key_file and not public_key_file:
+        raise Exception(f"A PEM key file is required to sign with {algorithm}")
+
+    private_key = None
+    if private_key_file:
+        with open(private_key_file, "rb") as pem:
+            private_key = load_pem_private_key(pem.read(), password=None)
+    if public_key_file:
+        with open(public_key_file, "rb") as pem:
+            public_key = load_pem_public_key(pem.read())
+    else:
+        public_key = private_key.public_key()
+
+    public_jwk = get_default_algorithms()[algorithm].to_jwk(
+        public_key, as_dict=True
+    )
+    kid = kid or jwk_thumbprint(public_jwk)
+    public_jwk.update({"kid": kid, "alg": algorithm, "use": "sig"})
+    return SigningKey(kid, algorithm, private_key, public_key, public_jwk)
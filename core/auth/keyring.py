@@ -0,0 +1,177 @@
+"""Define the key rings signing the tokens, allowing the secrets rotation.
+
+The keys are declared in the JSON file pointed by JWT_KEYRING_FILE:
+
+    {
+        "session": [
+            {"kid": "2026-10", "alg": "EdDSA", "private_key_file": "..."},
+            {"kid": "2026-07", "alg": "HS256", "secret": "...",
+             "retired_on": "2026-10-01T00:00:00+00:00"}
+        ],
+        "activation": [
+            {"kid": "2026-10", "secret": "..."}
+        ]
+    }
+
+The first key without retired_on signs the new tokens, the retired ones only
+verify the tokens they already signed and are dropped once those tokens have
+expired. Without a key ring file, SECRET_KEY and the JWT_* settings build a
+ring holding a single key.
+"""
+
+import json
+import math
+import threading
+import time
+
+import arrow
+
+from config.default import (
+    ACTIVATION_TOKEN_MAX_AGE,
+    JWT_ALG,
+    JWT_KEYRING_FILE,
+    JWT_PRIVATE_KEY_FILE,
+    JWT_PUBLIC_KEY_FILE,
+    JWT_SESSION_MAX_AGE,
+    SECRET_KEY,
+)
+from core.auth.jwt.keys import SigningKey, load_signing_key
+
+
+class KeyRing:
+    """Declare a set of signing keys indexed by their kid."""
+
+    def __init__(self, keys: list, max_token_age: int):
+        """Declare constructor for the key ring.
+
+        Args:
+            keys (list): pairs of SigningKey and retirement unix timestamp (None for the keys still in use), the first key in use signs the new tokens.
+            max_token_age (int): the longest lifetime in seconds of a token signed by the ring.
+
+        Raises:
+            Exception: No key of the ring is in use.
+        """
+        self.max_token_age = max_token_age
+        self.version = 0
+        self._keys = {key.kid: key for key, _ in keys}
+        self._expires_on = {
+            key.kid: retired_on + max_token_age
+            for key, retired_on in keys
+            if retired_on is not None
+        }
+        in_use = [key for key, retired_on in keys if retired_on is None]
+        if not in_use:
+            raise Exception("The key ring has no key in use !")
+        self.active_key = in_use[0]
+        self._next_prune = min(self._expires_on.values(), default=math.inf)
+        self._lock = threading.Lock()
+
+    def get(self, kid: str) -> SigningKey:
+        """Retrieve the key which signed a token.
+
+        Args:
+            kid (str): the kid stamped on the token, None for the tokens issued before the key ring.
+
+        Raises:
+            Exception: The kid is unknown or its key has been pruned.
+
+        Returns:
+            SigningKey: the key verifying the token.
+        """
+        if time.time() >= self._next_prune:
+            self.prune()
+        if kid is None:
+            return self.active_key
+        try:
+            return self._keys[kid]
+        except KeyError:
+            raise Exception(f"Unknown signing key: {kid}")
+
+    def keys(self) -> list:
+        """List the keys still able to verify a token.
+
+        Returns:
+            list: the SigningKey of the ring.
+        """
+        if time.time() >= self._next_prune:
+            self.prune()
+        return list(self._keys.values())
+
+    def prune(self):
+        """Drop the retired keys whose tokens can no longer be valid."""
+        now = time.time()
+        with self._lock:
+            expired = [
+                kid
+                for kid, expires_on in self._expires_on.items()
+                if expires_on <= now
+            ]
+            for kid in expired:
+                del self._keys[kid]
+                del self._expires_on[kid]
+            if expired:
+                self.version += 1
+            self._next_prune = min(self._expires_on.values(), default=math.inf)
+
+
+def load_key_ring(
+    entries: list, max_token_age: int, default_algorithm: str
+) -> KeyRing:
+    """Build a key ring from its declaration.
+
+    Args:
+        entries (list): the keys declared in the key ring file.
+        max_token_age (int): the longest lifetime in seconds of a token signed by the ring.
+        default_algorithm (str): the algorithm of the keys declaring none.
+
+    Returns:
+        KeyRing: the key ring.
+    """
+    keys = []
+    for entry in entries:
+        key = load_signing_key(
+            entry.get("alg", default_algorithm),
+            secret=entry.get("secret"),
+            private_key_file=entry.get("private_key_file"),
+            public_key_file=entry.get("public_key_file"),
+            kid=entry["kid"],
+        )
+        retired_on = entry.get("retired_on")
+        keys.append(
+            (key, arrow.get(retired_on).timestamp() if retired_on else None)
+        )
+    return KeyRing(keys, max_token_age)
+
+
+def load_key_rings() -> tuple:
+    """Build the key rings of the session and activation tokens.
+
+    Returns:
+        tuple: the session key ring and the activation key ring.
+    """
+    if JWT_KEYRING_FILE:
+        with open(JWT_KEYRING_FILE) as keyring_file:
+            declaration = json.load(keyring_file)
+        return (
+            load_key_ring(
+                declaration["session"], JWT_SESSION_MAX_AGE, JWT_ALG
+            ),
+            load_key_ring(
+                declaration["activation"], ACTIVATION_TOKEN_MAX_AGE, "HS256"
+            ),
+        )
+
+    session_key = load_signing_key(
+        JWT_ALG,
+        secret=SECRET_KEY,
+        private_key_file=JWT_PRIVATE_KEY_FILE,
+        public_key_file=JWT_PUBLIC_KEY_FILE,
+    )
+    activation_key = load_signing_key("HS256", secret=SECRET_KEY)
+    return (
+        KeyRing([(session_key, None)], JWT_SESSION_MAX_AGE),
+        KeyRing([(activation_key, None)], ACTIVATION_TOKEN_MAX_AGE),
+    )
+
+
+session_key_ring, activation_key_ring = load_key_rings()
@@ -2,40 +2,54 @@
 
 from itsdangerous import URLSafeTimedSerializer
 
+from config.default import ACTIVATION_TOKEN_MAX_AGE
 
-def generate_activation_token(
-    application_secret_key, application_password_salt, email
-):
+# Separates the kid of the signing key from the token, it never appears in
+# the url safe tokens of itsdangerous.
+KID_SEPARATOR = "~"
+
+
+def generate_activation_token(key_ring, application_password_salt, email):
     """Create the one use token for the user to activate his/her account.
 
     Args:
-        application_secret_key (str): The secret key of the application.
+        key_ring (KeyRing): The key ring signing the activation tokens.
         application_password_salt (str): secret key specific for managing the activation token.
         email (str): The email of the user.
 
     Returns:
         str: The one-time use token to activate the account.
     """
-    serializer = URLSafeTimedSerializer(application_secret_key)
-    return serializer.dumps(email, salt=application_password_salt)
+    signing_key = key_ring.active_key
+    serializer = URLSafeTimedSerializer(signing_key.signing_key)
+    token = serializer.dumps(email, salt=application_password_salt)
+    if signing_key.kid:
+        return f"{signing_key.kid}{KID_SEPARATOR}{token}"
+    return token
 
 
 def confirm_activation_token(
-    application_secret_key, application_password_salt, token, expiration=3600
+    key_ring,
+    application_password_salt,
+    token,
+    expiration=ACTIVATION_TOKEN_MAX_AGE,
 ):
     """Allow to validate a pre-generated activation token.
 
     Args:
-        application_secret_key (str): The secret key of the application.
+        key_ring (KeyRing): The key ring signing the activation tokens.
         application_password_salt (str): secret key specific for managing the activation token.
         token (str): The one-time use token to activate the account.
-        expiration (int, optional): the expiration time for the token in minutes. Defaults to 3600.
+        expiration (int, optional): the expiration time for the token in seconds. Defaults to ACTIVATION_TOKEN_MAX_AGE.
 
     Returns:
         str: the email represented for this token.
     """
-    serializer = URLSafeTimedSerializer(application_secret_key)
+    kid = None
+    if KID_SEPARATOR in token:
+        kid, token = token.split(KID_SEPARATOR, 1)
     try:
+        serializer = URLSafeTimedSerializer(key_ring.get(kid).verifying_key)
         email = serializer.loads(
             token,
             salt=application_password_salt,
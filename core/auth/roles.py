@@ -0,0 +1,234 @@
+"""Define the registry compiling the roles into bit masks.
+
+Every role owns a bit, the roles of a user are carried by the tokens and
+the caches as the OR of their bits. The bits follow the order of the ROLES
+setting: new roles must be appended, reordering it would grant the roles
+of the tokens already issued to other users.
+
+A role may include other roles (ROLE_INHERITANCE) and grant named
+permissions (ROLE_PERMISSIONS). The graph is compiled into the transitive
+closure whenever it changes: each role and each permission gets the mask
+of all the roles implying it, so a check is a bitwise AND at request time.
+"""
+
+import threading
+from typing import NamedTuple
+
+# The masks are sent to clients in JSON, keep them exact for JavaScript.
+MAX_ROLES = 53
+
+
+class Requirement(NamedTuple):
+    """Declare the roles and permissions all needed by an endpoint."""
+
+    roles: tuple = ()
+    permissions: tuple = ()
+
+
+class RoleRegistry:
+    """Declare the registry of the roles, their bits and their closure."""
+
+    def __init__(self, roles=(), inheritance=None, permissions=None):
+        """Declare constructor for the registry.
+
+        Args:
+            roles (iterable, optional): the names of the roles, in the order of their bits. Defaults to ().
+            inheritance (dict, optional): the roles directly included by each role. Defaults to None.
+            permissions (dict, optional): the permissions directly granted by each role. Defaults to None.
+
+        Raises:
+            Exception: The inheritance or the permissions name a role missing from roles.
+        """
+        self._bits = {}
+        self._includes = {}
+        self._grants = {}
+        self._implied_by = {}
+        self._granted_by = {}
+        self._lock = threading.Lock()
+        roles = list(roles)
+        inheritance = inheritance or {}
+        permissions = permissions or {}
+        # A role only named by the inheritance or the permissions would take
+        # a bit among the roles, changing the meaning of the issued masks.
+        undeclared = {
+            *inheritance,
+            *permissions,
+            *(role for included in inheritance.values() for role in included),
+        }.difference(roles)
+        if undeclared:
+            raise Exception(f"Roles {sorted(undeclared)} are not in ROLES !")
+        for role in roles:
+            self._bit(role)
+        for role in roles:
+            self.define_role(
+                role, inheritance.get(role, ()), permissions.get(role, ())
+            )
+
+    def _bit(self, role: str) -> int:
+        if role not in self._bits:
+            if len(self._bits) >= MAX_ROLES:
+                raise Exception(f"No bit left for the role {role} !")
+            self._bits[role] = 1 << len(self._bits)
+            self._includes[role] = set()
+            self._grants[role] = set()
+        return self._bits[role]
+
+    def define_role(self, role: str, includes=(), permissions=()) -> int:
+        """Declare a role, or extend one, and recompile the closure.
+
+        Args:
+            role (str): the name of the role.
+            includes (iterable, optional): the roles it includes, declared if new. Defaults to ().
+            permissions (iterable, optional): the permissions it grants. Defaults to ().
+
+        Raises:
+            Exception: There are already MAX_ROLES roles.
+
+        Returns:
+            int: the bit of the role.
+        """
+        with self._lock:
+            bit = self._bit(role)
+            for included in includes:
+                self._bit(included)
+                self._includes[role].add(included)
+            self._grants[role].update(permissions)
+            self._compile()
+        return bit
+
+    def _compile(self):
+        implied_by = {role: 0 for role in self._bits}
+        granted_by = {}
+        for role, bit in self._bits.items():
+            # Every role reachable from this one, cycles included.
+            reached = {role}
+            pending = [role]
+            while pending:
+                for included in self._includes[pending.pop()]:
+                    if included not in reached:
+                        reached.add(included)
+                        pending.append(included)
+            for included in reached:
+                implied_by[included] |= bit
+                for permission in self._grants[included]:
+                    granted_by[permission] = (
+                        granted_by.get(permission, 0) | bit
+                    )
+        # Swapped at once, the checks never see a half compiled closure.
+        self._implied_by, self._granted_by = implied_by, granted_by
+
+    def mask(self, roles) -> int:
+        """Compile roles into a mask, ignoring the unknown ones.
+
+        Args:
+            roles (iterable): the names of the roles.
+
+        Returns:
+            int: the OR of the bits of the roles.
+        """
+        mask = 0
+        for role in roles:
+            mask |= self._bits.get(role, 0)
+        return mask
+
+    def names(self, mask: int) -> frozenset:
+        """Decode a mask into the names of its roles.
+
+        Args:
+            mask (int): a mask built by this registry.
+
+        Returns:
+            frozenset: the names of the roles.
+        """
+        return frozenset(
+            role for role, bit in self._bits.items() if mask & bit
+        )
+
+    def effective_names(self, mask: int) -> frozenset:
+        """Decode a mask into its roles and all the roles they include.
+
+        Args:
+            mask (int): a mask built by this registry.
+
+        Returns:
+            frozenset: the names of the roles held directly or inherited.
+        """
+        implied_by = self._implied_by
+        return frozenset(
+            role for role in self._bits if mask & implied_by[role]
+        )
+
+    def require(self, roles=(), permissions=()) -> Requirement:
+        """Build the requirement of an endpoint.
+
+        Args:
+            roles (iterable, optional): the roles needed. Defaults to ().
+            permissions (iterable, optional): the permissions needed. Defaults to ().
+
+        Raises:
+            Exception: A role or a permission is not registered, no user could ever have it.
+
+        Returns:
+            Requirement: the requirement to check with allows.
+        """
+        roles, permissions = tuple(roles), tuple(permissions)
+        unknown = [role for role in roles if role not in self._bits] + [
+            permission
+            for permission in permissions
+            if permission not in self._granted_by
+        ]
+        if unknown:
+            raise Exception(f"Unknown roles or permissions {unknown} !")
+        return Requirement(roles, permissions)
+
+    def allows(self, mask: int, requirement: Requirement) -> bool:
+        """Check a mask meets a requirement.
+
+        Args:
+            mask (int): the roles of a user.
+            requirement (Requirement): the requirement built by require.
+
+        Returns:
+            bool: True if the roles hold or inherit every required role and permission.
+        """
+        implied_by, granted_by = self._implied_by, self._granted_by
+        for role in requirement.roles:
+            if not mask & implied_by[role]:
+                return False
+        for permission in requirement.permissions:
+            if not mask & granted_by[permission]:
+                return False
+        return True
+
+
+_role_registry_lock = threading.Lock()
+
+
+def __getattr__(name: str):
+    """Build the registry of the configured roles on first use.
+
+    The settings are read lazily, so RoleRegistry is importable without them.
+
+    Args:
+        name (str): the attribute missing from the module.
+
+    Raises:
+        AttributeError: the attribute is not role_registry.
+
+    Returns:
+        RoleRegistry: the registry of ROLES, ROLE_INHERITANCE and ROLE_PERMISSIONS.
+    """
+    if name != "role_registry":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _role_registry_lock:
+        if "role_registry" not in globals():
+            from config.default import (
+                ROLE_INHERITANCE,
+                ROLE_PERMISSIONS,
+                ROLES,
+            )
+
+            globals()["role_registry"] = RoleRegistry(
+                ROLES, ROLE_INHERITANCE, ROLE_PERMISSIONS
+            )
+    return globals()["role_registry"]
@@ -0,0 +1,100 @@
+"""Define the in-process caches shared by the application."""
+
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Declare a thread-safe LRU cache whose entries expire after a delay."""
+
+    def __init__(self, max_size: int, ttl: float = None):
+        """Declare constructor for the cache.
+
+        Args:
+            max_size (int): the maximum number of entries kept, the least recently used ones are evicted first.
+            ttl (float, optional): the default lifetime of an entry in seconds. Defaults to None meaning entries only expire when an explicit deadline is given.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Retrieve a cached value if it is still fresh.
+
+        Args:
+            key (hashable): the key of the entry.
+            default (any, optional): the value returned on a miss. Defaults to None.
+
+        Returns:
+            any: the cached value, or the default when absent or expired.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= now:
+                del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl: float = None, expires_at: float = None):
+        """Store a value in the cache.
+
+        Args:
+            key (hashable): the key of the entry.
+            value (any): the value to cache.
+            ttl (float, optional): the lifetime of this entry in seconds. Defaults to the cache ttl.
+            expires_at (float, optional): an absolute unix timestamp after which the entry is stale. Takes precedence over ttl.
+        """
+        if expires_at is None:
+            ttl = self.ttl if ttl is None else ttl
+            expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        """Drop an entry from the cache.
+
+        Args:
+            key (hashable): the key of the entry.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop all the entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """Describe the usage of the cache.
+
+        Returns:
+            dict: the size, bound, hits, misses and hit ratio of the cache.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
@@ -1,10 +1,16 @@
 """Define the module to validate users inputs."""
 
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from flask import current_app
 from pybreaker import CircuitBreaker
 
 from config.default import (
     CIRCUIT_BREAK_MAX_FAIL,
     CIRCUIT_BREAK_RESET_TIMEOUT,
+    EMAIL_MAX_LENGTH,
+    PASSWORD_SCORING_MODE,
     RULE_PASSWORD_MAX_LENGTH,
     RULE_PASSWORD_MIN_LENGTH,
     RULE_PASSWORD_MIN_STRENGTH_SCORE,
@@ -14,13 +20,27 @@ from config.default import (
     RULE_PASSWORD_WITH_SYMBOLS,
     RULE_PASSWORD_WITH_UPPERCASE,
     RULE_USERNAME_MAX_CHAR,
+    VALIDATION_DEADLINE,
+    VALIDATION_POOL_SIZE,
     WS_SCORING_PASSWORD_URL_API,
 )
 from core.common.error_codes import (
     __RESPONSE_STATUS_200,
     __RESPONSE_STATUS_422,
+    __RESPONSE_STATUS_503,
+)
+from core.common.executors import ForkSafeThreadPool
+from core.common.messages import (
+    __EMAIL_INVALID,
+    __PASSWORD_BREACHED,
+    __PASSWORD_TOO_LONG,
+    __USERNAME_INVALID,
+    __VALIDATION_FAILED,
+    __VALIDATION_TIMEOUT,
+)
+from core.services.validators.breached_passwords import (
+    BreachedPasswordValidator,
 )
-from core.common.messages import __EMAIL_INVALID, __USERNAME_INVALID
 from core.services.validators.emails import EmailValidator
 from core.services.validators.passwords import PasswordValidator
 from core.services.validators.usernames import UsernameValidator
@@ -29,6 +49,10 @@ circuit_breaker = CircuitBreaker(
     fail_max=CIRCUIT_BREAK_MAX_FAIL, reset_timeout=CIRCUIT_BREAK_RESET_TIMEOUT
 )
 
+validation_pool = ForkSafeThreadPool(
+    max_workers=VALIDATION_POOL_SIZE, thread_name_prefix="account-validation"
+)
+
 
 def __valid_email(email: str) -> dict:
     return EmailValidator.is_valid_email(email)
@@ -40,36 +64,212 @@ def __valid_username(username: str) -> bool:
     )
 
 
-@circuit_breaker
+password_rules = {
+    "has_digits": RULE_PASSWORD_WITH_DIGITS,
+    "has_lowercase": RULE_PASSWORD_WITH_LOWERCASE,
+    "has_spaces": RULE_PASSWORD_WITH_SPACES,
+    "has_symbols": RULE_PASSWORD_WITH_SYMBOLS,
+    "has_uppercase": RULE_PASSWORD_WITH_UPPERCASE,
+    "min_length": RULE_PASSWORD_MIN_LENGTH,
+    "max_length": RULE_PASSWORD_MAX_LENGTH,
+    "min_accepted_score": RULE_PASSWORD_MIN_STRENGTH_SCORE,
+}
+
+
 def __valid_password(password: str) -> dict:
-    url_api = WS_SCORING_PASSWORD_URL_API
+    if PASSWORD_SCORING_MODE == "local" or not WS_SCORING_PASSWORD_URL_API:
+        return PasswordValidator.is_valid_password_offline(
+            password=password, **password_rules
+        )
+    return __score_password(password, password_rules)
 
-    has_digits = RULE_PASSWORD_WITH_DIGITS
-    has_lowercase = RULE_PASSWORD_WITH_LOWERCASE
-    has_spaces = RULE_PASSWORD_WITH_SPACES
-    has_symbols = RULE_PASSWORD_WITH_SYMBOLS
-    has_uppercase = RULE_PASSWORD_WITH_UPPERCASE
-    min_length = RULE_PASSWORD_MIN_LENGTH
-    max_length = RULE_PASSWORD_MAX_LENGTH
-    min_accepted_score = RULE_PASSWORD_MIN_STRENGTH_SCORE
 
+@circuit_breaker
+def __score_password(password: str, rules: dict) -> dict:
     return PasswordValidator.is_valid_password(
-        url_api=url_api,
-        password=password,
-        has_digits=has_digits,
-        has_lowercase=has_lowercase,
-        has_spaces=has_spaces,
-        has_symbols=has_symbols,
-        has_uppercase=has_uppercase,
-        min_length=min_length,
-        max_length=max_length,
-        min_accepted_score=min_accepted_score,
+        url_api=WS_SCORING_PASSWORD_URL_API, password=password, **rules
+    )
+
+
+def __check_username(username: str) -> dict:
+    if not __valid_username(username):
+        return {
+            "status": False,
+            "message": __USERNAME_INVALID,
+            "status-code": __RESPONSE_STATUS_422,
+        }
+    return {"status": True}
+
+
+def __check_email(email: str) -> dict:
+    email_check = __valid_email(email)
+    if not email_check["status"]:
+        return {
+            "status": False,
+            "message": __EMAIL_INVALID,
+            "status-code": __RESPONSE_STATUS_422,
+        }
+    return {"status": True, "email": email_check["email"]}
+
+
+def __check_breached_password(password: str) -> dict:
+    if BreachedPasswordValidator.is_breached_password(password):
+        return {
+            "status": False,
+            "message": __PASSWORD_BREACHED,
+            "status-code": __RESPONSE_STATUS_422,
+        }
+    return {"status": True}
+
+
+def __check_password(password: str) -> dict:
+    try:
+        # Validation of the input password: format + strength
+        password_score = __valid_password(password)
+    except CircuitBreaker.Error:
+        # The scoring service is down, the password is accepted.
+        return {"status": True}
+    if not password_score["status"]:
+        return {
+            "status": False,
+            "message": password_score["message"],
+            "status-code": __RESPONSE_STATUS_422,
+        }
+    return {"status": True}
+
+
+def __max_length(rule, default: int) -> int:
+    try:
+        return int(rule)
+    except (TypeError, ValueError):
+        return default
+
+
+def __check_lengths(username: str, email: str, password: str) -> dict:
+    limits = (
+        (
+            username,
+            __max_length(RULE_USERNAME_MAX_CHAR, 30),
+            __USERNAME_INVALID,
+        ),
+        (email, EMAIL_MAX_LENGTH, __EMAIL_INVALID),
+        (
+            password,
+            __max_length(RULE_PASSWORD_MAX_LENGTH, 50),
+            __PASSWORD_TOO_LONG,
+        ),
     )
+    for value, max_length, message in limits:
+        if value is not None and len(value) > max_length:
+            return {
+                "status": False,
+                "message": message,
+                "status-code": __RESPONSE_STATUS_422,
+            }
+    return {"status": True}
+
+
+def __timed(timings: dict, name: str, check, value) -> dict:
+    started = time.perf_counter()
+    try:
+        return check(value)
+    finally:
+        timings[name] = time.perf_counter() - started
 
 
 def validate_account(username: str, email: str, password: str) -> dict:
     """Validate a user account according to the rules implemented for usernames, passowrds and emails.
 
+    The lengths are checked first, so every check runs on a bounded input.
+    The checks then run concurrently under a single deadline of
+    VALIDATION_DEADLINE seconds, the first failing check answers and the
+    checks not started yet are cancelled. A check raising an error fails
+    the validation.
+
+    Args:
+        username (str): input user name
+        email (str): input email of the user
+        password (str): input password
+
+    Returns:
+        dict: indicate the response status code, a status and a message.
+    """
+    # The checks cannot be interrupted once started, the unbounded inputs
+    # are rejected before they can hold a thread of the validation pool.
+    lengths_check = __check_lengths(username, email, password)
+    if not lengths_check["status"]:
+        return lengths_check
+
+    deadline = time.monotonic() + VALIDATION_DEADLINE
+    timings = {}
+    checks = {
+        "username": (__check_username, username),
+        "email": (__check_email, email),
+        "breached_password": (__check_breached_password, password),
+        "password": (__check_password, password),
+    }
+    pending = {
+        validation_pool.submit(__timed, timings, name, check, value): name
+        for name, (check, value) in checks.items()
+    }
+
+    results = {}
+    failure = None
+    while pending and failure is None:
+        done, _ = wait(
+            pending,
+            timeout=max(0, deadline - time.monotonic()),
+            return_when=FIRST_COMPLETED,
+        )
+        if not done:
+            failure = {
+                "status": False,
+                "message": __VALIDATION_TIMEOUT,
+                "status-code": __RESPONSE_STATUS_503,
+            }
+            break
+        for future in done:
+            name = pending.pop(future)
+            try:
+                results[name] = future.result()
+            except Exception:
+                current_app.logger.exception(
+                    "The %s check of the account failed", name
+                )
+                results[name] = {
+                    "status": False,
+                    "message": __VALIDATION_FAILED,
+                    "status-code": __RESPONSE_STATUS_503,
+                }
+            if not results[name]["status"]:
+                failure = results[name]
+                break
+
+    # The checks already running cannot be interrupted, they end unnoticed.
+    for future in pending:
+        future.cancel()
+    current_app.logger.debug(
+        "Account validation timings (s): %s, unfinished: %s",
+        timings,
+        sorted(pending.values()),
+    )
+
+    if failure is not None:
+        return failure
+
+    return {
+        "email": results["email"]["email"],
+        "status": True,
+        "status-code": __RESPONSE_STATUS_200,
+    }
+
+
+def validate_account_offline(username: str, email: str, password: str) -> dict:
+    """Validate a user account without any network call.
+
+    Meant for the bulk imports: the domain of the email is not resolved and
+    the password is scored in-process, the checks run one after the other.
+
     Args:
         username (str): input user name
         email (str): input email of the user
@@ -78,7 +278,6 @@ def validate_account(username: str, email: str, password: str) -> dict:
     Returns:
         dict: indicate the response status code, a status and a message.
     """
-    # Validation of username
     if not __valid_username(username):
         return {
             "status": False,
@@ -86,26 +285,23 @@ def validate_account(username: str, email: str, password: str) -> dict:
             "status-code": __RESPONSE_STATUS_422,
         }
 
-    # Validation of email
-    email_check = __valid_email(email)
+    email_check = EmailValidator.is_valid_email(
+        email, check_deliverability=False
+    )
     if not email_check["status"]:
         return {
             "status": False,
             "message": __EMAIL_INVALID,
             "status-code": __RESPONSE_STATUS_422,
         }
-    email = email_check["email"]
 
-    try:
-        # Validation of the input password: format + strength
-        password_score = __valid_password(password)
-    except CircuitBreaker.Error:
-        # return JsonResponse({"error": "Service temporarily unavailable. Please try again later."}, status=503)
-        return {
-            "email": email,
-            "status": True,
-            "status-code": __RESPONSE_STATUS_200,
-        }
+    breached_check = __check_breached_password(password)
+    if not breached_check["status"]:
+        return breached_check
+
+    password_score = PasswordValidator.is_valid_password_offline(
+        password=password, **password_rules
+    )
     if not password_score["status"]:
         return {
             "status": False,
@@ -114,7 +310,7 @@ def validate_account(username: str, email: str, password: str) -> dict:
         }
 
     return {
-        "email": email,
+        "email": email_check["email"],
         "status": True,
         "status-code": __RESPONSE_STATUS_200,
     }
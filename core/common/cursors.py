@@ -0,0 +1,45 @@
+"""Define the opaque cursors of the keyset paginations.
+
+A cursor encodes the sort key of the last row of a page, the next page
+starts strictly after it. Clients must not build or parse them.
+"""
+
+import base64
+import json
+import uuid
+from datetime import datetime
+
+
+def encode_cursor(created_on: datetime, id: uuid.UUID) -> str:
+    """Encode the position of a row.
+
+    Args:
+        created_on (datetime): the creation date of the row.
+        id (UUID): the id of the row, breaking the ties on the date.
+
+    Returns:
+        str: the URL safe cursor.
+    """
+    position = json.dumps([created_on.isoformat(), str(id)]).encode()
+    return base64.urlsafe_b64encode(position).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """Decode the position of a row.
+
+    Args:
+        cursor (str): a cursor built by encode_cursor.
+
+    Raises:
+        ValueError: The cursor is malformed.
+
+    Returns:
+        tuple: the creation date and the id of the row.
+    """
+    try:
+        created_on, id = json.loads(
+            base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        )
+        return datetime.fromisoformat(created_on), uuid.UUID(id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {e}") from e
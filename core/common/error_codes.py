@@ -6,3 +6,4 @@ __RESPONSE_STATUS_401 = 401
 __RESPONSE_STATUS_403 = 403
 __RESPONSE_STATUS_422 = 422
 __RESPONSE_STATUS_500 = 500
+__RESPONSE_STATUS_503 = 503
@@ -0,0 +1,47 @@
+"""Define the thread pools shared by the requests of a process."""
+
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class ForkSafeThreadPool:
+    """Declare a thread pool started lazily in each process.
+
+    A forked worker never inherits the threads of its parent, it starts its
+    own pool on first use.
+    """
+
+    def __init__(self, max_workers: int, thread_name_prefix: str):
+        """Declare constructor for the thread pool.
+
+        Args:
+            max_workers (int): the number of threads of the pool.
+            thread_name_prefix (str): the prefix of the threads names.
+        """
+        self.max_workers = max_workers
+        self.thread_name_prefix = thread_name_prefix
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def submit(self, function, *args, **kwargs) -> Future:
+        """Schedule a call on the pool of the current process.
+
+        Args:
+            function (callable): the function to call.
+            *args: the positional arguments of the call.
+            **kwargs: the keyword arguments of the call.
+
+        Returns:
+            Future: the pending call.
+        """
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix=self.thread_name_prefix,
+                    )
+                    self._pid = os.getpid()
+        return self._executor.submit(function, *args, **kwargs)
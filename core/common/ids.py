@@ -0,0 +1,62 @@
+"""Define the factories of the primary keys.
+
+The UUIDv7 of RFC 9562 start with their creation time in milliseconds: the
+keys created together are close in the primary key index, the inserts
+touch its right-most pages instead of random ones.
+"""
+
+import os
+import threading
+import time
+import uuid
+
+from config.default import USER_ID_VERSION
+
+_lock = threading.Lock()
+_last_timestamp = 0
+_last_counter = 0
+
+
+def uuid7() -> uuid.UUID:
+    """Generate a time-ordered UUID version 7.
+
+    The 12 bits following the timestamp count the ids generated in the same
+    millisecond, keeping the ids of a process strictly increasing.
+
+    Returns:
+        UUID: the new id.
+    """
+    global _last_timestamp, _last_counter
+
+    random_bits = int.from_bytes(os.urandom(10), "big")
+    with _lock:
+        timestamp = time.time_ns() // 1_000_000
+        if timestamp > _last_timestamp:
+            # Start from a random point of the lower half of the counter.
+            counter = random_bits >> 69
+        else:
+            timestamp = _last_timestamp
+            counter = _last_counter + 1
+            if counter > 0xFFF:
+                # The counter overflowed, borrow the next millisecond.
+                timestamp += 1
+                counter = 0
+        _last_timestamp, _last_counter = timestamp, counter
+
+    value = (
+        (timestamp & 0xFFFFFFFFFFFF) << 80
+        | 0x7 << 76
+        | counter << 64
+        | 0b10 << 62
+        | random_bits & 0x3FFFFFFFFFFFFFFF
+    )
+    return uuid.UUID(int=value)
+
+
+def new_user_id() -> uuid.UUID:
+    """Generate the id of a new user in the version set by USER_ID_VERSION.
+
+    Returns:
+        UUID: a UUIDv7, or a UUIDv4 when USER_ID_VERSION is 4.
+    """
+    return uuid.uuid4() if USER_ID_VERSION == 4 else uuid7()
@@ -7,8 +7,14 @@ __ACTIVATION_MSG = "You must activate your account first!"
 __LOGIN_MSG = "You must login first!"
 __USERNAME_INVALID = "The username is invalid !"
 __EMAIL_INVALID = "The email is invalid !"
+__PASSWORD_BREACHED = (  # nosec - it is not hardcoded password.
+    "This password appeared in a data breach, please choose another one !"
+)
 __USER_CREATION_ERROR = "Error when creating user !"
 __USER_WITH_EMAIL_ALREADY_EXISTS = "A user already exists for this email !"
+__USER_WITH_USERNAME_ALREADY_EXISTS = (
+    "A user already exists for this username !"
+)
 __WELCOME_BACK = "Welcome back !"
 __SIGNUP_SUCCESSFUL = "You successfully signed up."
 __ACTIVATION_SUCCESSFUL = "Congratulations, your account is now activated."
@@ -22,3 +28,16 @@ __DEMAND_RENEW_ACTIVATION = (
 __EMAIL_RESENT = "A new confirmation email has been sent."
 __GENERIC_ERROR = "Something went wrong."
 __ACCOUNT_ACTIVATED = "Your account has been activated."
+__TOKENS_LIST_INVALID = "A non empty list of tokens is expected !"
+__TOKENS_LIST_TOO_LONG = "Too many tokens to introspect at once !"
+__VALIDATION_TIMEOUT = (
+    "The account could not be validated in time, please try again later."
+)
+__VALIDATION_FAILED = (
+    "The account could not be validated, please try again later."
+)
+__PASSWORD_TOO_LONG = (  # nosec - it is not hardcoded password.
+    "The password is too long !"
+)
+__CURSOR_INVALID = "The pagination cursor is invalid !"
+__EXPORT_FILTER_INVALID = "The export filters are invalid !"
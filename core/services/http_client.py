@@ -0,0 +1,111 @@
+"""Define the pooled keep-alive HTTP client calling the external services."""
+
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class PooledHttpClient:
+    """Declare an HTTP client reusing its connections within a process."""
+
+    def __init__(
+        self,
+        pool_size: int = 10,
+        connect_timeout: float = 1.0,
+        read_timeout: float = 5.0,
+        keep_alive: bool = True,
+    ):
+        """Declare constructor for the client.
+
+        Args:
+            pool_size (int, optional): the maximum number of connections kept per host. Defaults to 10.
+            connect_timeout (float, optional): the timeout in seconds to open a connection. Defaults to 1.0.
+            read_timeout (float, optional): the timeout in seconds to read a response. Defaults to 5.0.
+            keep_alive (bool, optional): indicate if the connections are reused between calls. Defaults to True.
+        """
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        self.keep_alive = keep_alive
+        self.requests = 0
+        self.errors = 0
+        self._session = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        """Give the session of the current process.
+
+        A forked worker never reuses the sockets of its parent, it opens its
+        own pool on first use.
+
+        Returns:
+            requests.Session: the pooled session.
+        """
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=4,
+                        pool_maxsize=self.pool_size,
+                        max_retries=0,
+                    )
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    if not self.keep_alive:
+                        session.headers["Connection"] = "close"
+                    self._session = session
+                    self._pid = os.getpid()
+        return self._session
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """Send a POST request through the pool.
+
+        Args:
+            url (str): the url to call.
+            **kwargs: the arguments of requests.Session.post.
+
+        Raises:
+            requests.RequestException: the call failed.
+
+        Returns:
+            requests.Response: the response.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        self.requests += 1
+        try:
+            return self.session.post(url, **kwargs)
+        except requests.RequestException:
+            self.errors += 1
+            raise
+
+    def stats(self) -> dict:
+        """Describe the usage of the pool.
+
+        Returns:
+            dict: the calls made and failed, and per host the connections opened, the requests sent and the idle connections.
+        """
+        pools = {}
+        if self._session is not None:
+            adapter = self._session.get_adapter("https://")
+            for key in adapter.poolmanager.pools.keys():
+                pool = adapter.poolmanager.pools[key]
+                pools[f"{pool.scheme}://{pool.host}:{pool.port}"] = {
+                    "connections_opened": pool.num_connections,
+                    "requests": pool.num_requests,
+                    # The free slots of the queue are filled with None.
+                    "idle_connections": (
+                        sum(conn is not None for conn in pool.pool.queue)
+                        if pool.pool
+                        else 0
+                    ),
+                }
+        return {
+            "pool_size": self.pool_size,
+            "requests": self.requests,
+            "errors": self.errors,
+            "pools": pools,
+        }
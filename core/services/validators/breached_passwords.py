@@ -0,0 +1,216 @@
+"""Screen the passwords against a local file of breached password hashes.
+
+The file holds the sorted SHA-1 or NTLM digests of the breached passwords
+with their number of occurrences, behind a fan-out table of the records
+offsets per 2-bytes prefix. It is memory-mapped and searched by binary
+search, only the fan-out table is loaded in memory.
+
+Build it from the public text dumps ("HASH:COUNT" lines sorted by hash):
+    python -m core.services.validators.breached_passwords dump.txt out.bin
+"""
+
+import argparse
+import hashlib
+import mmap
+import struct
+import sys
+from array import array
+
+from config.default import (
+    BREACHED_PASSWORDS_FILE,
+    BREACHED_PASSWORDS_MIN_COUNT,
+)
+
+MAGIC = b"IAMBRCH1"
+# magic, hash kind, number of records
+HEADER = struct.Struct("<8sB7xQ")
+FANOUT_ENTRIES = 256 * 256 + 1
+FANOUT = struct.Struct(f"<{FANOUT_ENTRIES}Q")
+OCCURRENCES = struct.Struct("<I")
+
+HASH_SHA1 = 1
+HASH_NTLM = 2
+HASH_KINDS = {"sha1": HASH_SHA1, "ntlm": HASH_NTLM}
+HASH_SIZES = {HASH_SHA1: 20, HASH_NTLM: 16}
+
+
+def hash_password(password: str, kind: int) -> bytes:
+    """Compute the digest of a password as stored in the dumps.
+
+    Args:
+        password (str): the password.
+        kind (int): HASH_SHA1 or HASH_NTLM.
+
+    Returns:
+        bytes: the digest of the password.
+    """
+    if kind == HASH_NTLM:
+        # MD4 may be missing from the OpenSSL build, hashlib raises then.
+        return hashlib.new("md4", password.encode("utf-16-le")).digest()
+    return hashlib.sha1(
+        password.encode("utf-8"), usedforsecurity=False
+    ).digest()
+
+
+class BreachedPasswordIndex:
+    """Declare the memory-mapped index of the breached password hashes."""
+
+    def __init__(self, path: str):
+        """Map the index file.
+
+        Args:
+            path (str): the path of the file built by build_index.
+
+        Raises:
+            Exception: The file is not a breached passwords index.
+        """
+        with open(path, "rb") as index_file:
+            self._map = mmap.mmap(
+                index_file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+        magic, self.kind, self.count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or self.kind not in HASH_SIZES:
+            raise Exception(f"{path} is not a breached passwords index !")
+        self.hash_size = HASH_SIZES[self.kind]
+        self.record_size = self.hash_size + OCCURRENCES.size
+        self._fanout = array("Q")
+        self._fanout.frombytes(
+            self._map[HEADER.size : HEADER.size + FANOUT.size]
+        )
+        if sys.byteorder == "big":
+            self._fanout.byteswap()
+        self._records_offset = HEADER.size + FANOUT.size
+
+    def occurrences(self, digest: bytes) -> int:
+        """Look a digest up in O(log n).
+
+        Args:
+            digest (bytes): the digest of a password.
+
+        Returns:
+            int: the number of times the password was breached, 0 if never.
+        """
+        prefix = int.from_bytes(digest[:2], "big")
+        low, high = self._fanout[prefix], self._fanout[prefix + 1]
+        while low < high:
+            middle = (low + high) // 2
+            offset = self._records_offset + middle * self.record_size
+            candidate = self._map[offset : offset + self.hash_size]
+            if candidate < digest:
+                low = middle + 1
+            elif candidate > digest:
+                high = middle
+            else:
+                return OCCURRENCES.unpack_from(
+                    self._map, offset + self.hash_size
+                )[0]
+        return 0
+
+    def is_breached(self, password: str, min_count: int = 1) -> bool:
+        """Check if a password appears in the breaches.
+
+        Args:
+            password (str): the password to check.
+            min_count (int, optional): the occurrences from which a password is rejected. Defaults to 1.
+
+        Returns:
+            bool: True if the password was breached at least min_count times.
+        """
+        digest = hash_password(password, self.kind)
+        return self.occurrences(digest) >= min_count
+
+    def close(self):
+        """Unmap the index file."""
+        self._map.close()
+
+
+def build_index(source, target, kind: int) -> int:
+    """Convert a text dump into an index file.
+
+    Args:
+        source (file): the text dump, one "HASH[:COUNT]" line per password, sorted by hash.
+        target (file): the binary file to write.
+        kind (int): HASH_SHA1 or HASH_NTLM.
+
+    Raises:
+        Exception: The dump is not sorted or holds a digest of the wrong size.
+
+    Returns:
+        int: the number of records written.
+    """
+    hash_size = HASH_SIZES[kind]
+    fanout = [0] * FANOUT_ENTRIES
+    target.write(b"\0" * (HEADER.size + FANOUT.size))
+
+    count = 0
+    previous = b""
+    for line in source:
+        line = line.strip()
+        if not line:
+            continue
+        hex_digest, _, occurrences = line.partition(":")
+        digest = bytes.fromhex(hex_digest)
+        if len(digest) != hash_size:
+            raise Exception(f"Unexpected digest size on line {count + 1} !")
+        if digest <= previous:
+            raise Exception(f"The dump is not sorted at line {count + 1} !")
+        target.write(digest)
+        target.write(OCCURRENCES.pack(min(int(occurrences or 1), 0xFFFFFFFF)))
+        fanout[int.from_bytes(digest[:2], "big") + 1] += 1
+        previous = digest
+        count += 1
+
+    for prefix in range(1, FANOUT_ENTRIES):
+        fanout[prefix] += fanout[prefix - 1]
+    target.seek(0)
+    target.write(HEADER.pack(MAGIC, kind, count))
+    target.write(FANOUT.pack(*fanout))
+    return count
+
+
+class BreachedPasswordValidator:
+    """Declare the validator screening the breached passwords."""
+
+    index = None
+
+    @staticmethod
+    def is_breached_password(password: str) -> bool:
+        """Check a password against the configured breached passwords file.
+
+        Args:
+            password (str): the password to check.
+
+        Returns:
+            bool: True if the password was breached, False otherwise or when no file is configured.
+        """
+        if not BREACHED_PASSWORDS_FILE or not password:
+            return False
+        if BreachedPasswordValidator.index is None:
+            BreachedPasswordValidator.index = BreachedPasswordIndex(
+                BREACHED_PASSWORDS_FILE
+            )
+        return BreachedPasswordValidator.index.is_breached(
+            password, BREACHED_PASSWORDS_MIN_COUNT
+        )
+
+
+def main():
+    """Build an index file from a text dump of breached password hashes."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("source", help="the text dump, '-' for stdin")
+    parser.add_argument("target", help="the index file to write")
+    parser.add_argument("--hash", choices=HASH_KINDS, default="sha1")
+    args = parser.parse_args()
+
+    source = (
+        sys.stdin
+        if args.source == "-"
+        else open(args.source, encoding="ascii")
+    )
+    with source, open(args.target, "wb") as target:
+        count = build_index(source, target, HASH_KINDS[args.hash])
+    print(f"{count} hashes written to {args.target}")
+
+
+if __name__ == "__main__":
+    main()
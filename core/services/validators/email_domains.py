@@ -0,0 +1,143 @@
+"""Cache the deliverability of the email domains.
+
+The DNS resolution of a domain is shared by all the emails of that domain:
+the result is kept for EMAIL_DOMAIN_POSITIVE_TTL seconds when the domain
+accepts emails and EMAIL_DOMAIN_NEGATIVE_TTL seconds otherwise, concurrent
+signups on a cold domain wait for the same lookup.
+"""
+
+import os
+import threading
+
+from email_validator import EmailUndeliverableError
+from email_validator.deliverability import validate_email_deliverability
+
+from config.default import (
+    EMAIL_DOMAIN_CACHE_MAX_SIZE,
+    EMAIL_DOMAIN_NEGATIVE_TTL,
+    EMAIL_DOMAIN_POSITIVE_TTL,
+    EMAIL_DOMAIN_RESOLVER_TIMEOUT,
+    EMAIL_DOMAIN_RESOLVER_WORKERS,
+    EMAIL_PREWARM_DOMAINS,
+)
+from core.common.caches import TTLCache
+from core.common.executors import ForkSafeThreadPool
+
+
+class DomainResolver:
+    """Declare the cached and concurrent resolver of the email domains."""
+
+    def __init__(
+        self,
+        max_size: int,
+        positive_ttl: float,
+        negative_ttl: float,
+        workers: int,
+        timeout: float,
+    ):
+        """Declare constructor for the resolver.
+
+        Args:
+            max_size (int): the maximum number of domains kept in cache.
+            positive_ttl (float): the lifetime in seconds of a deliverable domain.
+            negative_ttl (float): the lifetime in seconds of an undeliverable or unresolved domain.
+            workers (int): the number of concurrent DNS lookups.
+            timeout (float): the timeout in seconds of a DNS lookup.
+        """
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.timeout = timeout
+        self._cache = TTLCache(max_size=max_size)
+        self._pending = {}
+        self._pool = ForkSafeThreadPool(
+            max_workers=workers, thread_name_prefix="email-domains"
+        )
+        self._lock = threading.Lock()
+        # The lookups pending in a parent process never complete in a child.
+        os.register_at_fork(after_in_child=self._pending.clear)
+
+    def _lookup(self, ascii_domain: str, domain: str) -> str:
+        try:
+            info = validate_email_deliverability(
+                ascii_domain, domain, timeout=self.timeout
+            )
+        except EmailUndeliverableError as e:
+            error, ttl = str(e), self.negative_ttl
+        except Exception:
+            # An unexpected resolver failure must not block the signups.
+            error, ttl = "", self.negative_ttl
+        else:
+            error = ""
+            # A timed out lookup is accepted but retried sooner.
+            ttl = (
+                self.negative_ttl
+                if info.get("unknown-deliverability")
+                else self.positive_ttl
+            )
+        self._cache.set(ascii_domain, error, ttl=ttl)
+        with self._lock:
+            self._pending.pop(ascii_domain, None)
+        return error
+
+    def submit(self, ascii_domain: str, domain: str = None):
+        """Start the resolution of a domain unless it is cached or pending.
+
+        Args:
+            ascii_domain (str): the ASCII form of the domain.
+            domain (str, optional): the internationalized form of the domain. Defaults to the ASCII form.
+
+        Returns:
+            Future: the pending lookup, None when the domain is cached.
+        """
+        if self._cache.get(ascii_domain) is not None:
+            return None
+        return self._start(ascii_domain, domain or ascii_domain)
+
+    def _start(self, ascii_domain: str, domain: str):
+        with self._lock:
+            future = self._pending.get(ascii_domain)
+            if future is None:
+                future = self._pool.submit(self._lookup, ascii_domain, domain)
+                self._pending[ascii_domain] = future
+        return future
+
+    def check(self, ascii_domain: str, domain: str = None) -> str:
+        """Tell if a domain accepts emails.
+
+        Args:
+            ascii_domain (str): the ASCII form of the domain.
+            domain (str, optional): the internationalized form of the domain. Defaults to the ASCII form.
+
+        Returns:
+            str: the reason why the domain is undeliverable, empty if it is deliverable.
+        """
+        error = self._cache.get(ascii_domain)
+        if error is None:
+            error = self._start(ascii_domain, domain or ascii_domain).result()
+        return error
+
+    def prewarm(self, domains=EMAIL_PREWARM_DOMAINS):
+        """Resolve a list of domains in the background.
+
+        Args:
+            domains (iterable, optional): the domains to resolve. Defaults to EMAIL_PREWARM_DOMAINS.
+        """
+        for domain in domains:
+            self.submit(domain)
+
+    def stats(self) -> dict:
+        """Describe the usage of the domains cache.
+
+        Returns:
+            dict: the statistics of the cache and the number of pending lookups.
+        """
+        return {**self._cache.stats(), "pending": len(self._pending)}
+
+
+domain_resolver = DomainResolver(
+    max_size=EMAIL_DOMAIN_CACHE_MAX_SIZE,
+    positive_ttl=EMAIL_DOMAIN_POSITIVE_TTL,
+    negative_ttl=EMAIL_DOMAIN_NEGATIVE_TTL,
+    workers=EMAIL_DOMAIN_RESOLVER_WORKERS,
+    timeout=EMAIL_DOMAIN_RESOLVER_TIMEOUT,
+)
@@ -2,16 +2,22 @@
 
 from email_validator import EmailNotValidError, validate_email
 
+from core.services.validators.email_domains import domain_resolver
+
 
 class EmailValidator:
     """Describe the emails validation."""
 
     @staticmethod
-    def is_valid_email(email: str):
+    def is_valid_email(email: str, check_deliverability: bool = True):
         """Validate an email.
 
+        The deliverability of the domain is resolved through the cache of
+        the email domains instead of a DNS query per email.
+
         Args:
             email (str): the email to validate.
+            check_deliverability (bool, optional): indicate if the domain must accept emails. Defaults to True.
 
         Returns:
             dict: status: True if the email is valid, email: the nromalized string for an email.
@@ -20,12 +26,19 @@ class EmailValidator:
             return {"status": False, "message": "", "email": ""}
 
         try:
-            emailinfo = validate_email(email, check_deliverability=True)
-            return {
-                "status": True,
-                "message": "",
-                "email": emailinfo.normalized,
-            }
-
+            emailinfo = validate_email(email, check_deliverability=False)
         except EmailNotValidError as e:
             return {"status": False, "message": str(e), "email": ""}
+
+        if check_deliverability:
+            error = domain_resolver.check(
+                emailinfo.ascii_domain, emailinfo.domain
+            )
+            if error:
+                return {"status": False, "message": error, "email": ""}
+
+        return {
+            "status": True,
+            "message": "",
+            "email": emailinfo.normalized,
+        }
@@ -0,0 +1,343 @@
+"""Define the in-process scoring of the passwords strength.
+
+The scorer evaluates the same payload as the external scoring service and
+answers with the same messages, so it can replace the network call.
+"""
+
+import math
+import re
+import string
+
+PASSWORD_REQUIREMENTS_MESSAGE = (
+    "The password is not meeting the length and/or characters requirements !"
+)
+PASSWORD_STRENGTH_MESSAGE = "The strength of the password is too low !"
+
+# Entropy (in bits) granted a score of 100.
+FULL_SCORE_ENTROPY = 80
+# Entropy (in bits) of a repetition or a sequence, whatever its length.
+PATTERN_ENTROPY = 4
+
+COMMON_PASSWORDS = frozenset(
+    {
+        "123456",
+        "1234567",
+        "12345678",
+        "123456789",
+        "1234567890",
+        "111111",
+        "000000",
+        "123123",
+        "654321",
+        "121212",
+        "666666",
+        "696969",
+        "abc123",
+        "password",
+        "password1",
+        "passw0rd",
+        "qwerty",
+        "qwertyuiop",
+        "azerty",
+        "iloveyou",
+        "admin",
+        "administrator",
+        "welcome",
+        "letmein",
+        "monkey",
+        "dragon",
+        "master",
+        "login",
+        "princess",
+        "sunshine",
+        "football",
+        "baseball",
+        "soccer",
+        "starwars",
+        "superman",
+        "batman",
+        "trustno1",
+        "shadow",
+        "michael",
+        "jennifer",
+        "charlie",
+        "freedom",
+        "whatever",
+        "secret",
+        "changeme",
+        "default",
+        "hello",
+        "summer",
+        "winter",
+        "spring",
+        "autumn",
+        "access",
+        "flower",
+        "hunter",
+        "killer",
+        "ninja",
+        "mustang",
+        "cheese",
+        "computer",
+        "internet",
+        "pokemon",
+        "matrix",
+        "soleil",
+        "bonjour",
+        "motdepasse",
+        "contrasena",
+        "gateway",
+    }
+)
+
+KEYBOARD_ROWS = (
+    "`1234567890-=",
+    "qwertyuiop[]\\",
+    "asdfghjkl;'",
+    "zxcvbnm,./",
+    "azertyuiop",
+    "qsdfghjklm",
+    "wxcvbn",
+)
+
+LEET_SUBSTITUTIONS = str.maketrans(
+    {
+        "0": "o",
+        "1": "i",
+        "3": "e",
+        "4": "a",
+        "5": "s",
+        "7": "t",
+        "@": "a",
+        "$": "s",
+    }
+)
+
+LONGEST_ROW = max(len(row) for row in KEYBOARD_ROWS)
+
+SYMBOLS = frozenset(string.punctuation)
+
+REPEATED_CHARACTERS = re.compile(r"(.)\1{2,}")
+
+
+def _as_bool(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "1", "yes")
+    return bool(value)
+
+
+def _as_int(value, default: int) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _normalize(word: str) -> str:
+    """Fold the case and the leet substitutions of a word."""
+    return word.lower().translate(LEET_SUBSTITUTIONS)
+
+
+def _is_sequence(chunk: str) -> bool:
+    """Tell if a chunk is a run of consecutive or keyboard adjacent keys."""
+    lowered = chunk.lower()
+    steps = {ord(b) - ord(a) for a, b in zip(lowered, lowered[1:])}
+    if steps in ({1}, {-1}):
+        return True
+    return any(lowered in row or lowered[::-1] in row for row in KEYBOARD_ROWS)
+
+
+def _step(password: str, index: int):
+    """Give the code point step between a key and the next, None if unknown."""
+    a, b = password[index].lower(), password[index + 1].lower()
+    if len(a) != 1 or len(b) != 1:
+        return None
+    return ord(b) - ord(a)
+
+
+def _sequence_end(password: str, start: int) -> int:
+    """Give the end of the sequence of at least 3 keys starting at start.
+
+    Only the last step is checked as the run grows, the keyboard rows only
+    while the run is not longer than them, keeping the scan linear.
+    """
+    step = _step(password, start)
+    stepping = step in (1, -1) and _step(password, start + 1) == step
+    end = start + 3
+    while end < len(password):
+        stepping = stepping and _step(password, end - 1) == step
+        if not stepping and not (
+            end + 1 - start <= LONGEST_ROW
+            and _is_sequence(password[start : end + 1])
+        ):
+            break
+        end += 1
+    return end
+
+
+class PasswordStrengthScorer:
+    """Declare the offline scorer of the passwords strength."""
+
+    # Normalized like the passwords, so the words with digits still match.
+    dictionary = frozenset(_normalize(word) for word in COMMON_PASSWORDS)
+    # No substring longer than it can be a word of the dictionary.
+    longest_word = max(len(word) for word in dictionary)
+
+    @classmethod
+    def load_dictionary(cls, path: str):
+        """Extend the dictionary of weak words with a file of one word per line.
+
+        Args:
+            path (str): the path of the dictionary file.
+        """
+        with open(path, encoding="utf-8") as words:
+            cls.dictionary = frozenset(
+                _normalize(word) for word in COMMON_PASSWORDS
+            ) | frozenset(
+                _normalize(word.strip())
+                for word in words
+                if len(word.strip()) > 3
+            )
+            cls.longest_word = max(len(word) for word in cls.dictionary)
+
+    @staticmethod
+    def meets_characteristics(password: str, characteristics: dict) -> bool:
+        """Check the length and the classes of characters of a password.
+
+        Args:
+            password (str): the password to check.
+            characteristics (dict): the requirements sent to the scoring service.
+
+        Returns:
+            bool: True if the password meets every requirement, False otherwise.
+        """
+        min_length = _as_int(characteristics.get("min_length"), 10)
+        max_length = _as_int(characteristics.get("max_length"), 50)
+        if not min_length <= len(password) <= max_length:
+            return False
+
+        requirements = (
+            ("has_digits", str.isdigit),
+            ("has_lowercase", str.islower),
+            ("has_uppercase", str.isupper),
+            ("has_spaces", str.isspace),
+            ("has_symbols", SYMBOLS.__contains__),
+        )
+        for name, predicate in requirements:
+            if _as_bool(characteristics.get(name, False)) and not any(
+                predicate(character) for character in password
+            ):
+                return False
+        return True
+
+    @classmethod
+    def entropy(cls, password: str) -> float:
+        """Estimate the entropy of a password in bits.
+
+        The brute force entropy of the characters classes is reduced for the
+        parts of the password made of dictionary words, sequences and
+        repetitions, each of them counting as a single guess.
+
+        Args:
+            password (str): the password to score.
+
+        Returns:
+            float: the estimated entropy.
+        """
+        pool = 0
+        if any(character.islower() for character in password):
+            pool += 26
+        if any(character.isupper() for character in password):
+            pool += 26
+        if any(character.isdigit() for character in password):
+            pool += 10
+        if any(character in SYMBOLS for character in password):
+            pool += len(SYMBOLS)
+        if any(character.isspace() for character in password):
+            pool += 1
+        if any(ord(character) > 127 for character in password):
+            pool += 100
+        if not pool:
+            return 0.0
+
+        normalized = _normalize(password)
+        if normalized in cls.dictionary:
+            return math.log2(len(cls.dictionary))
+
+        weak = [False] * len(password)
+        words = 0
+        patterns = 0
+        # Looking the substrings up keeps the cost independent of the
+        # dictionary size.
+        start = 0
+        while start < len(normalized):
+            for end in range(
+                min(len(normalized), start + cls.longest_word), start + 3, -1
+            ):
+                if normalized[start:end] in cls.dictionary:
+                    weak[start:end] = [True] * (end - start)
+                    words += 1
+                    start = end
+                    break
+            else:
+                start += 1
+        for match in REPEATED_CHARACTERS.finditer(password):
+            weak[match.start() : match.end()] = [True] * len(match.group())
+            patterns += 1
+        index = 0
+        while index <= len(password) - 3:
+            end = index + 3
+            if _is_sequence(password[index:end]):
+                end = _sequence_end(password, index)
+                weak[index:end] = [True] * (end - index)
+                patterns += 1
+                index = end
+            else:
+                index += 1
+
+        return (
+            weak.count(False) * math.log2(pool)
+            + words * math.log2(len(cls.dictionary))
+            + patterns * PATTERN_ENTROPY
+        )
+
+    @classmethod
+    def score(cls, password: str) -> int:
+        """Score the strength of a password.
+
+        Args:
+            password (str): the password to score.
+
+        Returns:
+            int: the score, from 0 to 100.
+        """
+        entropy = cls.entropy(password)
+        return min(100, round(entropy * 100 / FULL_SCORE_ENTROPY))
+
+    @classmethod
+    def evaluate(
+        cls, password: str, characteristics: dict, min_accepted_score
+    ) -> dict:
+        """Evaluate a password as the external scoring service does.
+
+        Args:
+            password (str): the password to score.
+            characteristics (dict): the requirements of the password.
+            min_accepted_score (int): the minimum score of a valid password.
+
+        Returns:
+            dict: the score and, when failing, the messages of the scoring service.
+        """
+        if len(password) > _as_int(characteristics.get("max_length"), 50):
+            # Rejected unscored, the cost of the scoring grows with the length.
+            return {
+                "score": 0,
+                "message_password": PASSWORD_REQUIREMENTS_MESSAGE,
+            }
+        score = cls.score(password)
+        response = {"score": score}
+        if not cls.meets_characteristics(password, characteristics):
+            response["message_password"] = PASSWORD_REQUIREMENTS_MESSAGE
+        if score < _as_int(min_accepted_score, 70):
+            response["message_score"] = PASSWORD_STRENGTH_MESSAGE
+        return response
@@ -5,8 +5,30 @@ import json
 import requests
 from tenacity import retry, stop_after_attempt, wait_exponential
 
-from config.default import RETRY_CALLS, WS_SCORING_PASSWORD_URL_API
-from core import app
+from config.default import (
+    PASSWORD_DICTIONARY_FILE,
+    RETRY_CALLS,
+    SCORING_CONNECT_TIMEOUT,
+    SCORING_KEEP_ALIVE,
+    SCORING_POOL_SIZE,
+    SCORING_READ_TIMEOUT,
+)
+from core.services.http_client import PooledHttpClient
+from core.services.validators.password_strength import (
+    PASSWORD_REQUIREMENTS_MESSAGE,
+    PASSWORD_STRENGTH_MESSAGE,
+    PasswordStrengthScorer,
+)
+
+scoring_client = PooledHttpClient(
+    pool_size=SCORING_POOL_SIZE,
+    connect_timeout=SCORING_CONNECT_TIMEOUT,
+    read_timeout=SCORING_READ_TIMEOUT,
+    keep_alive=SCORING_KEEP_ALIVE,
+)
+
+if PASSWORD_DICTIONARY_FILE:
+    PasswordStrengthScorer.load_dictionary(PASSWORD_DICTIONARY_FILE)
 
 
 class PasswordValidator:
@@ -57,8 +79,6 @@ class PasswordValidator:
                 "message": "The password is empty !",
             }
 
-        url_api = WS_SCORING_PASSWORD_URL_API
-
         payload = {
             "password": password,
             "characteristics": {
@@ -74,7 +94,7 @@ class PasswordValidator:
         }
 
         try:
-            response = requests.post(url_api, json=payload, timeout=5)
+            response = scoring_client.post(url_api, json=payload)
         except requests.RequestException:
             return {
                 "status": True,
@@ -85,9 +105,76 @@ class PasswordValidator:
                 ),
             }
 
-        status_code = response.status_code
-        message = json.loads(response.text)
+        return PasswordValidator.interpret_scoring(
+            response.status_code, json.loads(response.text)
+        )
 
+    @staticmethod
+    def is_valid_password_offline(
+        password: str,
+        has_digits: bool = True,
+        has_lowercase: bool = True,
+        has_spaces: bool = False,
+        has_symbols: bool = True,
+        has_uppercase: bool = True,
+        min_length: int = 10,
+        max_length: int = 50,
+        min_accepted_score: int = 70,
+    ):
+        """Validate a password with the in-process scorer instead of the scoring service.
+
+        Args:
+            password (str): the password to score.
+            has_digits (bool, optional): indicate if the password should have ate least one digit. Defaults to True.
+            has_lowercase (bool, optional): indicate if the password should have at least one lowercase character. Defaults to True.
+            has_spaces (bool, optional): indicate if the password should have at least one space character. Defaults to False.
+            has_symbols (bool, optional): indicate if the password should have at least one special symbol character. Defaults to True.
+            has_uppercase (bool, optional): indicate if the password should have at least one uppercase character. Defaults to True.
+            min_length (int, optional): indicate the minimum length characters for a password valid. Defaults to 10.
+            max_length (int, optional): indicate the maximum length characters for a valid password. Defaults to 50.
+            min_accepted_score (int, optional): indicate the minimum a valid score of a password. Defaults to 70.
+
+        Returns:
+            dict: the same status, status code and message as is_valid_password.
+        """
+        if (
+            password is None
+            or password
+            == ""  # nosec - there is no hardcoded password, just a value control.
+        ):
+            return {
+                "status": False,
+                "status-code": 270,
+                "message": "The password is empty !",
+            }
+
+        characteristics = {
+            "has_digits": has_digits,
+            "has_lowercase": has_lowercase,
+            "has_spaces": has_spaces,
+            "has_symbols": has_symbols,
+            "has_uppercase": has_uppercase,
+            "max_length": max_length,
+            "min_length": min_length,
+        }
+        return PasswordValidator.interpret_scoring(
+            200,
+            PasswordStrengthScorer.evaluate(
+                password, characteristics, min_accepted_score
+            ),
+        )
+
+    @staticmethod
+    def interpret_scoring(status_code: int, message: dict) -> dict:
+        """Translate the answer of a password scoring into a validation result.
+
+        Args:
+            status_code (int): the status code of the scoring.
+            message (dict): the body of the scoring.
+
+        Returns:
+            dict: the status, status code and message of the validation.
+        """
         if status_code != 200:
             return {
                 "status": False,
@@ -96,19 +183,14 @@ class PasswordValidator:
             }
 
         else:
-            if (
-                message.get("message_score")
-                == "The strength of the password is too low !"
-            ):
+            if message.get("message_score") == PASSWORD_STRENGTH_MESSAGE:
                 return {
                     "status": False,
                     "status-code": 290,
                     "message": "The password is too weak !",
                 }
-            elif (
-                message.get("message_password")
-                == "The password is not meeting the length and/or characters"
-                " requirements !"
+            elif message.get("message_password") == (
+                PASSWORD_REQUIREMENTS_MESSAGE
             ):
                 return {
                     "status": False,
@@ -117,3 +199,12 @@ class PasswordValidator:
                 }
             else:
                 return {"status": True, "status-code": 200}
+
+    @staticmethod
+    def get_pool_stats() -> dict:
+        """Describe the usage of the connection pool of the scoring service.
+
+        Returns:
+            dict: the statistics of the pooled client.
+        """
+        return scoring_client.stats()
@@ -0,0 +1,7 @@
+"""Declare the blueprints for the module exposing the tokens to other services."""
+
+from flask import Blueprint
+
+tokens_bp = Blueprint("tokens", __name__)
+
+from core.tokens import routes
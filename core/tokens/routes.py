@@ -0,0 +1,211 @@
+"""Define the routes for the tokens module."""
+
+import hashlib
+import time
+
+from flask import Response, jsonify, make_response, request
+
+from config.default import (
+    FORWARD_AUTH_CACHE_MAX_SIZE,
+    FORWARD_AUTH_CACHE_TTL,
+    INTROSPECTION_MAX_TOKENS,
+    INTROSPECTION_PERMISSION,
+    JWKS_MAX_AGE,
+)
+from core.auth.auth_guard import auth_guard, authorize
+from core.auth.jwt.claims import decode_claims
+from core.auth.jwt.jwt_handler import (
+    decode_jwt,
+    extract_jwt,
+    get_jwks_document,
+)
+from core.auth.roles import role_registry
+from core.common.caches import TTLCache
+from core.common.error_codes import (
+    __RESPONSE_STATUS_200,
+    __RESPONSE_STATUS_401,
+    __RESPONSE_STATUS_403,
+    __RESPONSE_STATUS_422,
+)
+from core.common.messages import (
+    __TOKENS_LIST_INVALID,
+    __TOKENS_LIST_TOO_LONG,
+)
+from core.tokens import tokens_bp
+from core.users.models import GwUser
+
+# Forward authentication decisions, keyed by the token digest and the
+# requirement.
+forward_auth_decisions = TTLCache(
+    max_size=FORWARD_AUTH_CACHE_MAX_SIZE, ttl=FORWARD_AUTH_CACHE_TTL
+)
+
+
+@tokens_bp.route("/.well-known/jwks.json")
+def jwks():
+    """Define the endpoint publishing the public keys verifying the jwt.
+
+    Returns:
+        Response: the JWKS document, or an empty 304 when the ETag matches.
+    """
+    body, etag = get_jwks_document()
+    response = make_response(body)
+    response.mimetype = "application/json"
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = JWKS_MAX_AGE
+    return response.make_conditional(request)
+
+
+@tokens_bp.route("/auth/introspect", methods=("POST",))
+@auth_guard(permission=INTROSPECTION_PERMISSION)
+def introspect():
+    """Define the endpoint validating a batch of tokens at once.
+
+    Meant for the services, such as the API aggregator, the caller needs
+    the INTROSPECTION_PERMISSION. The users of all the valid tokens are
+    resolved with a single query, a token is valid when authorize would
+    accept it.
+
+    Returns:
+        json: for each token, in order, its validity, the user id, the active flag and the roles held or inherited by the user.
+    """
+    tokens = (request.get_json(silent=True) or {}).get("tokens")
+    if (
+        not isinstance(tokens, list)
+        or not tokens
+        or not all(isinstance(token, str) for token in tokens)
+    ):
+        return (
+            jsonify(
+                {
+                    "error": __TOKENS_LIST_INVALID,
+                    "status": __RESPONSE_STATUS_422,
+                }
+            ),
+            __RESPONSE_STATUS_422,
+        )
+    if len(tokens) > INTROSPECTION_MAX_TOKENS:
+        return (
+            jsonify(
+                {
+                    "error": __TOKENS_LIST_TOO_LONG,
+                    "status": __RESPONSE_STATUS_422,
+                }
+            ),
+            __RESPONSE_STATUS_422,
+        )
+
+    decoded = []
+    for token in tokens:
+        try:
+            decoded.append(decode_claims(decode_jwt(token)))
+        except Exception as e:
+            decoded.append(e)
+
+    states = GwUser.get_states_by_ids(
+        claims.user_id
+        for claims in decoded
+        if not isinstance(claims, Exception)
+    )
+
+    results = []
+    for claims in decoded:
+        if isinstance(claims, Exception):
+            results.append({"valid": False, "error": f"{claims}"})
+            continue
+        user_id = str(claims.user_id)
+        state = states.get(user_id)
+        results.append(
+            {
+                "valid": state is not None and state.can_authenticate,
+                "user": user_id,
+                "active": state is not None and state.active,
+                # The same held and inherited roles as /auth/verify.
+                "roles": (
+                    sorted(
+                        role_registry.effective_names(
+                            claims.role_mask | state.role_mask
+                        )
+                    )
+                    if state
+                    else []
+                ),
+            }
+        )
+
+    return (
+        jsonify(
+            {
+                "data": results,
+                "status": __RESPONSE_STATUS_200,
+            }
+        ),
+        __RESPONSE_STATUS_200,
+    )
+
+
+@tokens_bp.route("/auth/verify", methods=("GET", "HEAD", "POST"))
+def verify():
+    """Define the forward authentication endpoint for reverse proxies.
+
+    Nginx auth_request or Envoy ext_authz call it before every upstream
+    request. The required role and permission, if any, are read from the
+    X-Required-Role and X-Required-Permission headers or the role and
+    permission query parameters. Decisions on valid tokens are cached
+    for FORWARD_AUTH_CACHE_TTL seconds, never beyond the token expiration.
+
+    Returns:
+        Response: an empty response whose status is 200, 401 or 403, with the X-User-Id and X-User-Roles headers when granted.
+    """
+    try:
+        token = extract_jwt()
+    except Exception:
+        return Response(status=__RESPONSE_STATUS_401)
+
+    role = request.headers.get("X-Required-Role") or request.args.get("role")
+    permission = request.headers.get(
+        "X-Required-Permission"
+    ) or request.args.get("permission")
+    try:
+        requirement = role_registry.require(
+            (role,) if role else (), (permission,) if permission else ()
+        )
+    except Exception:
+        # No user can have a role or a permission unknown to the registry.
+        return Response(status=__RESPONSE_STATUS_403)
+    key = (hashlib.sha256(token.encode()).digest(), requirement)
+    cached = forward_auth_decisions.get(key)
+    if cached is None:
+        decision = authorize(token, requirement)
+        headers = {}
+        if decision.status == __RESPONSE_STATUS_200:
+            headers = {
+                "X-User-Id": str(decision.claims.user_id),
+                "X-User-Roles": ",".join(
+                    sorted(
+                        role_registry.effective_names(
+                            decision.claims.role_mask
+                            | decision.state.role_mask
+                        )
+                    )
+                ),
+            }
+        expires_at = None
+        if decision.claims is not None:
+            expires_at = time.time() + FORWARD_AUTH_CACHE_TTL
+            if decision.claims.expires_at:
+                expires_at = min(expires_at, decision.claims.expires_at)
+        cached = (decision.status, headers, expires_at)
+        if expires_at is not None:
+            forward_auth_decisions.set(key, cached, expires_at=expires_at)
+    status, headers, expires_at = cached
+    cache_control = "no-store"
+    if status == __RESPONSE_STATUS_200:
+        # The proxies may reuse a grant as long as this cache does, the
+        # seconds are rounded down so it never outlives the token.
+        max_age = max(0, int(expires_at - time.time()))
+        cache_control = f"private, max-age={max_age}"
+    return Response(
+        status=status, headers={**headers, "Cache-Control": cache_control}
+    )
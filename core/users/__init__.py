@@ -2,6 +2,6 @@
 
 from flask import Blueprint
 
+# The routes attach to it when core.users.routes is imported, by create_app
+# only: the forward-auth app reads the models without loading them.
 users_bp = Blueprint("users", __name__)
-
-from core.users import routes
@@ -0,0 +1,135 @@
+"""Declare the command line of the users module."""
+
+import json
+
+import click
+from flask.cli import AppGroup
+
+from config.default import HASHING_WORKERS, IMPORT_BATCH_SIZE
+from core.users.exports import EXPORT_FORMATS, ExportStats, export_users
+from core.users.imports import import_users, read_rows
+
+users_cli = AppGroup("users", help="Manage the users.")
+
+
+@users_cli.command("import")
+@click.argument("source", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--format",
+    "input_format",
+    type=click.Choice(["csv", "jsonl"]),
+    help="The format of SOURCE, guessed from its extension by default.",
+)
+@click.option(
+    "--checkpoint",
+    type=click.Path(dir_okay=False),
+    help="The checkpoint file, SOURCE.checkpoint by default.",
+)
+@click.option(
+    "--rejects",
+    type=click.File("a", encoding="utf-8"),
+    help="A JSON lines file receiving the rejected rows.",
+)
+@click.option(
+    "--role", "default_role", help="The role of the rows without one."
+)
+@click.option(
+    "--batch-size", type=int, default=IMPORT_BATCH_SIZE, show_default=True
+)
+@click.option(
+    "--workers",
+    type=int,
+    default=HASHING_WORKERS,
+    show_default=True,
+    help="The number of processes hashing the passwords.",
+)
+def import_command(
+    source,
+    input_format,
+    checkpoint,
+    rejects,
+    default_role,
+    batch_size,
+    workers,
+):
+    """Import the users of SOURCE, a CSV or JSON lines file.
+
+    Every row needs a username, an email and a password, the role is
+    optional. Rerun the same command to resume an interrupted import.
+    """
+
+    def reject(number, row, reason):
+        if rejects is not None:
+            row = {
+                key: value for key, value in row.items() if key != "password"
+            }
+            rejects.write(
+                json.dumps({"row": number, "reason": reason, **row}) + "\n"
+            )
+
+    progress = None
+    for progress in import_users(
+        read_rows(source, input_format),
+        checkpoint_path=checkpoint or f"{source}.checkpoint",
+        batch_size=batch_size,
+        workers=workers,
+        default_role=default_role,
+        on_reject=reject,
+    ):
+        click.echo(
+            f"rows {progress.rows}: imported {progress.imported},"
+            f" duplicates {progress.duplicates},"
+            f" rejected {progress.rejected}"
+            f" ({progress.rate:.0f} rows/s)"
+        )
+
+    if progress is None:
+        click.echo("Nothing left to import.")
+    else:
+        click.echo(f"Import done in {progress.elapsed:.1f}s.")
+
+
+@users_cli.command("export")
+@click.argument("target", type=click.Path(dir_okay=False, allow_dash=True))
+@click.option(
+    "--format",
+    "export_format",
+    type=click.Choice(EXPORT_FORMATS),
+    default="csv",
+    show_default=True,
+)
+@click.option(
+    "--gzip/--no-gzip",
+    "compress",
+    default=None,
+    help="Compress the export, by default when TARGET ends with .gz.",
+)
+@click.option("--active/--inactive", default=None)
+@click.option("--deleted/--not-deleted", default=None)
+@click.option("--role", help="Export only the users having this role.")
+@click.option("--created-from", type=click.DateTime())
+@click.option("--created-to", type=click.DateTime())
+@click.option("--progress-every", type=int, default=100000, show_default=True)
+def export_command(
+    target,
+    export_format,
+    compress,
+    progress_every,
+    **filters,
+):
+    """Export the users and their roles to TARGET, '-' for stdout."""
+    if compress is None:
+        compress = target.endswith(".gz")
+    filters = {
+        key: value for key, value in filters.items() if value is not None
+    }
+
+    stats = ExportStats()
+    reported = 0
+    with click.open_file(target, "wb") as output:
+        for chunk in export_users(export_format, compress, stats, **filters):
+            output.write(chunk)
+            if stats.rows - reported >= progress_every:
+                reported = stats.rows
+                click.echo(stats, err=True)
+    click.echo(f"Export done: {stats}", err=True)
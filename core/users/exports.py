@@ -0,0 +1,149 @@
+"""Export the users and their roles as CSV or JSON lines.
+
+The rows are read from a server-side cursor and encoded, optionally
+gzipped, as they come: the memory used does not depend on the number of
+users exported.
+"""
+
+import csv
+import io
+import json
+import time
+import zlib
+from datetime import datetime
+
+from config.default import EXPORT_CHUNK_SIZE, STREAM_BATCH_SIZE
+from core.users.models import GwUser
+
+EXPORT_MIMETYPES = {"csv": "text/csv", "jsonl": "application/jsonl"}
+EXPORT_FORMATS = tuple(EXPORT_MIMETYPES)
+EXPORT_FIELDS = (
+    "id",
+    "username",
+    "email",
+    "active",
+    "deleted",
+    "is_admin",
+    "created_on",
+    "roles",
+)
+# Separator of the roles in a CSV cell
+CSV_ROLES_SEPARATOR = "|"
+
+
+class ExportStats:
+    """Declare the counters of a running export."""
+
+    def __init__(self):
+        """Declare constructor for the counters."""
+        self.rows = 0
+        self.bytes = 0
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        """Give the seconds since the start of the export."""
+        return time.perf_counter() - self.started
+
+    @property
+    def rate(self) -> float:
+        """Give the rows exported per second."""
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self) -> str:
+        """Describe the progress of the export."""
+        return (
+            f"{self.rows} users, {self.bytes} bytes in {self.elapsed:.1f}s"
+            f" ({self.rate:.0f} users/s)"
+        )
+
+
+def parse_filters(args) -> dict:
+    """Read the export filters from query string arguments.
+
+    Args:
+        args (dict): the arguments, active and deleted as true/false, role, created_from and created_to as ISO 8601 dates.
+
+    Raises:
+        ValueError: A filter is malformed.
+
+    Returns:
+        dict: the filters for export_users.
+    """
+    filters = {}
+    for flag in ("active", "deleted"):
+        value = args.get(flag)
+        if value is not None:
+            if value.lower() not in ("true", "false", "1", "0"):
+                raise ValueError(f"{flag} must be true or false")
+            filters[flag] = value.lower() in ("true", "1")
+    if args.get("role"):
+        filters["role"] = args["role"]
+    for bound in ("created_from", "created_to"):
+        if args.get(bound):
+            filters[bound] = datetime.fromisoformat(args[bound])
+    return filters
+
+
+def encode_users(users, export_format: str, stats: ExportStats):
+    """Encode a stream of users into text chunks.
+
+    Args:
+        users (iterable): the users as described by GwUser.iter_all.
+        export_format (str): "csv" or "jsonl".
+        stats (ExportStats): the counters updated by the export.
+
+    Yields:
+        str: chunks of about EXPORT_CHUNK_SIZE characters.
+    """
+    buffer = io.StringIO()
+    if export_format == "csv":
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_FIELDS)
+    for user in users:
+        if export_format == "csv":
+            user["roles"] = CSV_ROLES_SEPARATOR.join(user["roles"])
+            writer.writerow([user[field] for field in EXPORT_FIELDS])
+        else:
+            buffer.write(json.dumps(user))
+            buffer.write("\n")
+        stats.rows += 1
+        if buffer.tell() >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def export_users(
+    export_format: str = "csv",
+    compress: bool = False,
+    stats: ExportStats = None,
+    **filters,
+):
+    """Stream an export of the users.
+
+    Args:
+        export_format (str, optional): "csv" or "jsonl". Defaults to "csv".
+        compress (bool, optional): gzip the export on the fly. Defaults to False.
+        stats (ExportStats, optional): the counters to update. Defaults to None.
+        **filters: the filters of GwUser.iter_all (active, deleted, role, created_from, created_to).
+
+    Yields:
+        bytes: the chunks of the export.
+    """
+    stats = stats if stats is not None else ExportStats()
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    for chunk in encode_users(
+        GwUser.iter_all(STREAM_BATCH_SIZE, **filters), export_format, stats
+    ):
+        data = chunk.encode("utf-8")
+        if compressor is not None:
+            data = compressor.compress(data)
+        if data:
+            stats.bytes += len(data)
+            yield data
+    if compressor is not None:
+        data = compressor.flush()
+        stats.bytes += len(data)
+        yield data
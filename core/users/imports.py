@@ -0,0 +1,214 @@
+"""Import users in bulk from CSV or JSON lines files.
+
+The rows are streamed and processed by batches: validated offline, their
+passwords hashed on a pool of processes, then inserted with a single
+multi-row INSERT per table. After each committed batch the number of rows
+consumed is written to a checkpoint file, an interrupted import resumes
+from there. Replaying a batch is harmless as the users already inserted
+are skipped by ON CONFLICT DO NOTHING.
+"""
+
+import csv
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, repeat
+from typing import NamedTuple
+
+import arrow
+from sqlalchemy.dialects.postgresql import insert
+
+from config.default import PASSWORD_HASH_METHOD
+from core import db
+from core.auth.hash_policy import make_hash
+from core.common.credentials_validator import validate_account_offline
+from core.common.ids import new_user_id
+from core.users.models import GwUser, GwUserRole
+
+
+class ImportProgress(NamedTuple):
+    """Declare the counters of an import after a batch."""
+
+    rows: int
+    imported: int
+    duplicates: int
+    rejected: int
+    elapsed: float
+    rate: float
+
+
+def read_rows(path: str, input_format: str = None):
+    """Stream the rows of a CSV (with a header) or JSON lines file.
+
+    Args:
+        path (str): the path of the file.
+        input_format (str, optional): "csv" or "jsonl". Defaults to the extension of the file.
+
+    Yields:
+        dict: the fields of a row.
+    """
+    input_format = input_format or (
+        "csv" if path.lower().endswith(".csv") else "jsonl"
+    )
+    with open(path, encoding="utf-8", newline="") as source:
+        if input_format == "csv":
+            yield from csv.DictReader(source)
+        else:
+            for line in source:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def read_checkpoint(path: str) -> dict:
+    """Load the checkpoint of an interrupted import.
+
+    Args:
+        path (str): the path of the checkpoint file.
+
+    Returns:
+        dict: the counters of the rows already consumed, zeroed if there is no checkpoint.
+    """
+    if not os.path.exists(path):
+        return {"rows": 0, "imported": 0, "duplicates": 0, "rejected": 0}
+    with open(path, encoding="utf-8") as checkpoint:
+        return json.load(checkpoint)
+
+
+def write_checkpoint(path: str, counters: dict):
+    """Replace the checkpoint atomically.
+
+    Args:
+        path (str): the path of the checkpoint file.
+        counters (dict): the counters of the rows consumed.
+    """
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as checkpoint:
+        json.dump(counters, checkpoint)
+        checkpoint.flush()
+        os.fsync(checkpoint.fileno())
+    os.replace(temporary, temporary[: -len(".tmp")])
+
+
+def insert_batch(users: list, roles: dict) -> int:
+    """Insert a batch of users and their role, skipping the taken ones.
+
+    Args:
+        users (list): the values of the gw_user rows.
+        roles (dict): the role of each user, keyed by its id.
+
+    Returns:
+        int: the number of users inserted.
+    """
+    users_table = GwUser.__table__
+    inserted = (
+        db.session.execute(
+            insert(users_table)
+            .on_conflict_do_nothing()
+            .returning(users_table.c.id),
+            users,
+        )
+        .scalars()
+        .all()
+    )
+    now = arrow.utcnow().datetime
+    role_rows = [
+        {"gwuser_id": user_id, "role": roles[user_id], "created_on": now}
+        for user_id in inserted
+        if roles[user_id]
+    ]
+    if role_rows:
+        db.session.execute(insert(GwUserRole.__table__), role_rows)
+    db.session.commit()
+    return len(inserted)
+
+
+def import_users(
+    rows,
+    checkpoint_path: str,
+    batch_size: int,
+    workers: int,
+    default_role: str = None,
+    on_reject=None,
+):
+    """Import a stream of rows into the users tables.
+
+    Args:
+        rows (iterable): the rows with a username, an email, a password and optionally a role.
+        checkpoint_path (str): the path of the checkpoint file.
+        batch_size (int): the number of rows per batch.
+        workers (int): the number of processes hashing the passwords.
+        default_role (str, optional): the role of the rows without one. Defaults to None.
+        on_reject (callable, optional): called with the row number, the row and the reason of each rejected row. Defaults to None.
+
+    Yields:
+        ImportProgress: the counters after each committed batch.
+    """
+    counters = read_checkpoint(checkpoint_path)
+    resumed_rows = counters["rows"]
+    rows = islice(rows, resumed_rows, None)
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+
+            accepted = []
+            for number, row in enumerate(batch, start=counters["rows"] + 1):
+                check = validate_account_offline(
+                    username=row.get("username"),
+                    email=row.get("email"),
+                    password=row.get("password"),
+                )
+                if check["status"]:
+                    accepted.append((row, check["email"]))
+                else:
+                    counters["rejected"] += 1
+                    if on_reject is not None:
+                        on_reject(number, row, check["message"])
+
+            hashes = pool.map(
+                make_hash,
+                [row["password"] for row, _ in accepted],
+                repeat(PASSWORD_HASH_METHOD),
+                chunksize=max(1, len(accepted) // (workers * 4)),
+            )
+            now = arrow.utcnow().datetime
+            users = []
+            roles = {}
+            for (row, email), password_hash in zip(accepted, hashes):
+                user_id = new_user_id()
+                roles[user_id] = row.get("role") or default_role
+                users.append(
+                    {
+                        "id": user_id,
+                        "username": row["username"],
+                        "email": email,
+                        "password": password_hash,
+                        "created_on": now,
+                        "active": False,
+                        "deleted": False,
+                        "is_admin": False,
+                        "role_names": (
+                            [roles[user_id]] if roles[user_id] else []
+                        ),
+                    }
+                )
+
+            imported = insert_batch(users, roles) if users else 0
+            counters["imported"] += imported
+            counters["duplicates"] += len(users) - imported
+            counters["rows"] += len(batch)
+            write_checkpoint(checkpoint_path, counters)
+
+            elapsed = time.perf_counter() - started
+            yield ImportProgress(
+                elapsed=elapsed,
+                rate=(counters["rows"] - resumed_rows) / elapsed,
+                **counters,
+            )
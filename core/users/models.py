@@ -1,13 +1,119 @@
 """Defines the models for the users module."""
 
 import uuid
+from dataclasses import dataclass
+from typing import NamedTuple
 
 import arrow
 from flask_login import UserMixin
-from sqlalchemy.dialects.postgresql import UUID
-from werkzeug.security import check_password_hash, generate_password_hash
-
+from sqlalchemy import event, func, inspect, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.sql.expression import ClauseElement
+
+from config.default import (
+    IDENTITY_CACHE_MAX_SIZE,
+    IDENTITY_CACHE_TTL,
+    USER_STATE_CACHE_MAX_SIZE,
+    USER_STATE_CACHE_TTL,
+)
 from core import db
+from core.auth.hashing import (
+    HashingPoolSaturated,
+    hash_password,
+    password_needs_rehash,
+    verify_password,
+)
+from core.auth.roles import role_registry
+from core.common.caches import TTLCache
+from core.common.ids import new_user_id
+
+
+class UserState(NamedTuple):
+    """Declare the snapshot of a user needed to authorize a request."""
+
+    active: bool
+    deleted: bool
+    roles: frozenset
+    role_mask: int
+
+    @property
+    def can_authenticate(self) -> bool:
+        """Tell if the tokens of the user are accepted."""
+        return self.active and not self.deleted
+
+
+@dataclass(frozen=True, slots=True)
+class Identity:
+    """Declare the read-only identity of a user, loaded without the ORM.
+
+    It answers the Flask-Login user protocol, so it can stand for the
+    current user of the requests only reading it.
+    """
+
+    id: uuid.UUID
+    username: str
+    email: str
+    active: bool
+    deleted: bool
+    is_admin: bool
+    role_names: tuple
+
+    @property
+    def is_authenticated(self) -> bool:
+        """Tell Flask-Login the identity was loaded from a session."""
+        return True
+
+    @property
+    def is_active(self) -> bool:
+        """Tell Flask-Login if the user may log in."""
+        return self.active and not self.deleted
+
+    @property
+    def is_anonymous(self) -> bool:
+        """Tell Flask-Login the identity is a real user."""
+        return False
+
+    def get_id(self) -> str:
+        """Give Flask-Login the id stored in the session."""
+        return str(self.id)
+
+
+# The unique constraints of gw_user, by the field they guard.
+UNIQUE_CONSTRAINTS = {
+    "gw_user_email_key": "email",
+    "uq_gw_user_email_lower": "email",
+    "gw_user_username_key": "username",
+}
+
+# Snapshots of the users state, keyed by the string form of their id.
+user_states = TTLCache(
+    max_size=USER_STATE_CACHE_MAX_SIZE, ttl=USER_STATE_CACHE_TTL
+)
+# Identities of the logged in users, keyed by the string form of their id.
+identities = TTLCache(max_size=IDENTITY_CACHE_MAX_SIZE, ttl=IDENTITY_CACHE_TTL)
+
+
+def invalidate_user(user_id):
+    """Drop the cached state and identity of a changed user.
+
+    The caches are per process, the other workers see the change once
+    their entries expire.
+
+    Args:
+        user_id (UUID | str): the id of the user.
+    """
+    user_states.invalidate(str(user_id))
+    identities.invalidate(str(user_id))
+
+
+def get_identity_cache_stats() -> dict:
+    """Describe the usage of the cache of the identities.
+
+    Returns:
+        dict: the size, hits, misses and hit ratio of the cache.
+    """
+    return identities.stats()
 
 
 class GwUserRole(db.Model):
@@ -18,7 +124,10 @@ class GwUserRole(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     role = db.Column(db.String(50), unique=False, nullable=False)
     gwuser_id = db.Column(
-        UUID(as_uuid=True), db.ForeignKey("gw_user.id"), nullable=False
+        UUID(as_uuid=True),
+        db.ForeignKey("gw_user.id"),
+        nullable=False,
+        index=True,
     )
     created_on = db.Column(db.DateTime, nullable=False)
 
@@ -45,10 +154,10 @@ class GwUser(db.Model, UserMixin):
 
     __tablename__ = "gw_user"
 
-    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = db.Column(UUID(as_uuid=True), primary_key=True, default=new_user_id)
     username = db.Column(db.String(30), unique=True, nullable=False)
     email = db.Column(db.String(80), unique=True, nullable=False)
-    password = db.Column(db.String(50), nullable=False)
+    password = db.Column(db.String(255), nullable=False)
     created_on = db.Column(db.DateTime, nullable=False)
     last_activation_token = db.Column(
         db.String(500), unique=False, nullable=True
@@ -66,17 +175,50 @@ class GwUser(db.Model, UserMixin):
         order_by="asc(GwUserRole.created_on)",
     )
     is_admin = db.Column(db.Boolean, default=False)
+    # Copy of the names of the roles, in the order of the relationship, read
+    # by the hot paths instead of joining gw_user_role.
+    role_names = db.Column(
+        ARRAY(db.String(50)), nullable=False, default=list, server_default="{}"
+    )
+
+    __table_args__ = (
+        # The emails are unique whatever their case, see get_by_email.
+        # Created by the migration 0005.
+        db.Index("uq_gw_user_email_lower", func.lower(email), unique=True),
+        # The indexes of the keyset pagination, created by the migration 0003.
+        db.Index("ix_gw_user_created_on_id", "created_on", "id"),
+        db.Index(
+            "ix_gw_user_live_created_on_id",
+            "created_on",
+            "id",
+            postgresql_where=db.text("NOT deleted"),
+        ),
+        db.Index(
+            "ix_gw_user_active_created_on_id",
+            "created_on",
+            "id",
+            postgresql_where=db.text("active AND NOT deleted"),
+        ),
+    )
 
-    def __init__(self, username, email, role):
+    def __init__(self, username, email, role=None):
         """Declare constructor for User.
 
+        The id is set here rather than by the database, the user and its
+        first role are then inserted by the same flush.
+
         Args:
             username (str): the username of a user
             email (str): the email of a user
+            role (str, optional): the first role of the user. Defaults to None.
         """
+        self.id = new_user_id()
+        self.role_names = []
         self.username = username
         self.email = email
         self.created_on = arrow.utcnow().datetime
+        if role:
+            self.roles.append(GwUserRole(self.id, role))
 
     def set_password(self, password):
         """Set the assword for a user.
@@ -84,18 +226,30 @@ class GwUser(db.Model, UserMixin):
         Args:
             password (str): the chosen password.
         """
-        self.password = generate_password_hash(password)
+        self.password = hash_password(password)
 
     def check_password(self, password):
         """Control that a given password is correct.
 
+        A correct password hashed with an outdated policy is hashed again
+        with the current one.
+
         Args:
             password (str): the password t ocheck.
 
         Returns:
             bool: True if the given password is the same as the stored one, False otherwise.
         """
-        return check_password_hash(self.password, password)
+        if not verify_password(self.password, password):
+            return False
+        if password_needs_rehash(self.password):
+            try:
+                self.set_password(password)
+            except HashingPoolSaturated:
+                # The upgrade waits for a quieter login.
+                return True
+            db.session.commit()
+        return True
 
     def save(self):
         """Save an instance of a user in the database."""
@@ -103,6 +257,32 @@ class GwUser(db.Model, UserMixin):
             db.session.add(self)
         db.session.commit()
 
+    def create(self):
+        """Insert a new user with its roles in a single transaction.
+
+        Raises:
+            IntegrityError: The username or the email is already taken, the session is rolled back.
+        """
+        db.session.add(self)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            raise
+
+    @staticmethod
+    def get_duplicated_field(error: IntegrityError) -> str:
+        """Tell which unique field a failed insert collided with.
+
+        Args:
+            error (IntegrityError): the error raised by the insert.
+
+        Returns:
+            str: "email" or "username", None for another violation.
+        """
+        diag = getattr(error.orig, "diag", None)
+        return UNIQUE_CONSTRAINTS.get(getattr(diag, "constraint_name", None))
+
     @staticmethod
     def add_role_to_user_by_id(user_id, role):
         """Set the role of a user.
@@ -114,7 +294,15 @@ class GwUser(db.Model, UserMixin):
         gw_user_role = GwUserRole(user_id, role)
         if not gw_user_role.id:
             db.session.add(gw_user_role)
+        # The row and its copy in gw_user.role_names in the same transaction.
+        db.session.execute(
+            db.update(GwUser)
+            .where(GwUser.id == user_id)
+            .values(role_names=func.array_append(GwUser.role_names, role)),
+            execution_options={"synchronize_session": False},
+        )
         db.session.commit()
+        invalidate_user(user_id)
 
     def __repr__(self):
         """Set the representation of an instance of a user.
@@ -136,9 +324,72 @@ class GwUser(db.Model, UserMixin):
         """
         return GwUser.query.get(id)
 
+    @staticmethod
+    def get_identity_by_id(id) -> Identity:
+        """Retrieve the identity of a user, without building a GwUser.
+
+        A single row of the needed columns is read, the result is neither
+        tracked by the session nor lazy loading anything.
+
+        Args:
+            id (UUID | str): the ID of a user.
+
+        Returns:
+            Identity: the identity of the user, None if the user does not exist or the id is malformed.
+        """
+        try:
+            id = uuid.UUID(str(id))
+        except ValueError:
+            return None
+        row = db.session.execute(
+            db.select(
+                GwUser.id,
+                GwUser.username,
+                GwUser.email,
+                GwUser.active,
+                GwUser.deleted,
+                GwUser.is_admin,
+                GwUser.role_names,
+            ).where(GwUser.id == id)
+        ).one_or_none()
+        if row is None:
+            return None
+        return Identity(
+            id=row.id,
+            username=row.username,
+            email=row.email,
+            active=row.active,
+            deleted=row.deleted,
+            is_admin=bool(row.is_admin),
+            role_names=tuple(row.role_names),
+        )
+
+    @staticmethod
+    def get_cached_identity_by_id(id) -> Identity:
+        """Retrieve the identity of a user through the identity cache.
+
+        The identity is kept in a per-process cache for IDENTITY_CACHE_TTL
+        seconds, the users changed by this process are dropped from it at
+        once.
+
+        Args:
+            id (UUID | str): the ID of a user.
+
+        Returns:
+            Identity: the identity of the user, None if the user does not exist or the id is malformed.
+        """
+        key = str(id)
+        identity = identities.get(key)
+        if identity is None:
+            identity = GwUser.get_identity_by_id(id)
+            # Unknown ids are not cached, forged sessions cannot fill it.
+            if identity is not None:
+                identities.set(key, identity)
+        return identity
+
     @staticmethod
     def get_by_email(email) -> "GwUser":
-        """Retrieve a user according to its email.
+        """Retrieve a user according to its email, ignoring the case.
 
         Args:
             email (str): the email of a user.
@@ -146,13 +397,16 @@ class GwUser(db.Model, UserMixin):
         Returns:
             User: An instance of a user.
         """
-        return GwUser.query.filter_by(email=email).first()
+        return GwUser.query.filter(
+            func.lower(GwUser.email) == email.lower()
+        ).first()
 
     def delete(self):
         """Mark a user as deleted."""
         self.deleted = True
         self.deactivated_on = arrow.utcnow().datetime
         db.session.commit()
+        invalidate_user(self.id)
 
     def is_active(self):
         """Check if a user is active.
@@ -176,6 +430,7 @@ class GwUser(db.Model, UserMixin):
         gw_user.active = True
         gw_user.activated_on = arrow.utcnow().datetime
         db.session.commit()
+        invalidate_user(id)
 
         return gw_user
 
@@ -184,6 +439,109 @@ class GwUser(db.Model, UserMixin):
         """Retrieve the list of all the users."""
         return GwUser.query.all()
 
+    def to_dict(self) -> dict:
+        """Describe a user for the admin listings.
+
+        Returns:
+            dict: the public fields and the roles of the user.
+        """
+        return {
+            "id": str(self.id),
+            "username": self.username,
+            "email": self.email,
+            "active": self.active,
+            "deleted": self.deleted,
+            "is_admin": bool(self.is_admin),
+            "created_on": self.created_on.isoformat(),
+            "roles": list(self.role_names),
+        }
+
+    @staticmethod
+    def get_page(limit: int, after: tuple = None) -> tuple:
+        """Retrieve a page of users ordered by creation date and id.
+
+        The page starts right after a given position instead of skipping
+        rows with an OFFSET, the roles are read from role_names.
+
+        Args:
+            limit (int): the maximum number of users of the page.
+            after (tuple, optional): the creation date and id of the last user of the previous page. Defaults to None for the first page.
+
+        Returns:
+            tuple: the users of the page and the position of its last user, None when it is the last page.
+        """
+        query = GwUser.query.order_by(GwUser.created_on, GwUser.id)
+        if after is not None:
+            query = query.filter(
+                tuple_(GwUser.created_on, GwUser.id) > tuple_(*after)
+            )
+        users = query.limit(limit + 1).all()
+        if len(users) <= limit:
+            return users, None
+        users = users[:limit]
+        return users, (users[-1].created_on, users[-1].id)
+
+    @staticmethod
+    def iter_all(
+        batch_size: int,
+        active: bool = None,
+        deleted: bool = None,
+        role: str = None,
+        created_from=None,
+        created_to=None,
+    ):
+        """Stream the users from a server-side cursor.
+
+        Only batch_size users are held at once.
+
+        Args:
+            batch_size (int): the number of rows fetched at once.
+            active (bool, optional): keep only the users with this active flag. Defaults to None.
+            deleted (bool, optional): keep only the users with this deleted flag. Defaults to None.
+            role (str, optional): keep only the users having this role. Defaults to None.
+            created_from (datetime, optional): keep only the users created from this date. Defaults to None.
+            created_to (datetime, optional): keep only the users created before this date. Defaults to None.
+
+        Yields:
+            dict: the same description of a user as to_dict.
+        """
+        query = db.select(
+            GwUser.id,
+            GwUser.username,
+            GwUser.email,
+            GwUser.active,
+            GwUser.deleted,
+            GwUser.is_admin,
+            GwUser.created_on,
+            GwUser.role_names,
+        )
+        if active is not None:
+            query = query.where(GwUser.active == active)
+        if deleted is not None:
+            query = query.where(GwUser.deleted == deleted)
+        if role is not None:
+            query = query.where(GwUser.role_names.any(role))
+        if created_from is not None:
+            query = query.where(GwUser.created_on >= created_from)
+        if created_to is not None:
+            query = query.where(GwUser.created_on < created_to)
+        result = db.session.execute(
+            query.order_by(GwUser.created_on, GwUser.id).execution_options(
+                yield_per=batch_size
+            )
+        )
+        for row in result:
+            yield {
+                "id": str(row.id),
+                "username": row.username,
+                "email": row.email,
+                "active": row.active,
+                "deleted": row.deleted,
+                "is_admin": bool(row.is_admin),
+                "created_on": row.created_on.isoformat(),
+                "roles": list(row.role_names),
+            }
+
     @staticmethod
     def get_user_roles_by_id(id) -> list:
         """Retrieve the list of all roles of the user.
@@ -206,10 +564,66 @@ class GwUser(db.Model, UserMixin):
         Returns:
             bool: True if the user is active, False otherwise.
         """
-        return GwUser.get_by_id(id).active
+        state = GwUser.get_state_by_id(id)
+        return state is not None and state.active
+
+    @staticmethod
+    def get_state_by_id(id) -> UserState:
+        """Retrieve the active flag, deleted flag and roles of a user.
+
+        The snapshot is read in a single query and kept in a per-process
+        cache for USER_STATE_CACHE_TTL seconds.
+
+        Args:
+            id (UUID): The id of the user.
+
+        Returns:
+            UserState: the state of the user, None if the user does not exist.
+        """
+        return GwUser.get_states_by_ids([id]).get(str(id))
 
-    staticmethod
+    @staticmethod
+    def get_states_by_ids(ids) -> dict:
+        """Retrieve the active flag, deleted flag and roles of many users.
+
+        The users missing from the cache are all read in a single IN query,
+        their roles from the role_names column.
 
+        Args:
+            ids (iterable): The ids of the users.
+
+        Returns:
+            dict: the UserState of the existing users, keyed by the string form of their id.
+        """
+        states = {}
+        missing = []
+        for id in ids:
+            key = str(id)
+            state = user_states.get(key)
+            if state is None:
+                missing.append(uuid.UUID(key))
+            else:
+                states[key] = state
+
+        if missing:
+            rows = db.session.execute(
+                db.select(
+                    GwUser.id, GwUser.active, GwUser.deleted, GwUser.role_names
+                ).where(GwUser.id.in_(missing))
+            )
+            for row in rows:
+                key = str(row.id)
+                states[key] = UserState(
+                    active=row.active,
+                    deleted=row.deleted,
+                    roles=frozenset(row.role_names),
+                    role_mask=role_registry.mask(row.role_names),
+                )
+                user_states.set(key, states[key])
+
+        return states
+
+    @staticmethod
     def reset_activation_token_by_id(id: UUID, activation_token: str):
         """Set the last activation token for the user.
 
@@ -219,3 +633,47 @@ class GwUser(db.Model, UserMixin):
         """
         GwUser.get_by_id(id).last_activation_token = activation_token
         db.session.commit()
+        invalidate_user(id)
+
+
+def _stored_role_names(user: GwUser):
+    """Give the role_names a change of the roles of a stored user applies to.
+
+    Args:
+        user (GwUser): the stored user.
+
+    Returns:
+        ClauseElement: the change already pending for this flush if any, the
+        column otherwise.
+    """
+    role_names = user.__dict__.get("role_names")
+    if isinstance(role_names, ClauseElement):
+        return role_names
+    return GwUser.role_names
+
+
+@event.listens_for(GwUser.roles, "append")
+def _copy_appended_role(user, user_role, initiator):
+    """Mirror a role appended to GwUser.roles into role_names."""
+    if inspect(user).has_identity:
+        # Appended in the UPDATE, a role added concurrently by
+        # add_role_to_user_by_id is kept. The value is reloaded after flush.
+        user.role_names = func.array_append(
+            _stored_role_names(user), user_role.role
+        )
+    else:
+        user.role_names = [*(user.role_names or []), user_role.role]
+
+
+@event.listens_for(GwUser.roles, "remove")
+def _copy_removed_role(user, user_role, initiator):
+    """Mirror a role removed from GwUser.roles into role_names."""
+    if inspect(user).has_identity:
+        user.role_names = func.array_remove(
+            _stored_role_names(user), user_role.role
+        )
+        return
+    role_names = list(user.role_names or [])
+    if user_role.role in role_names:
+        role_names.remove(user_role.role)
+    user.role_names = role_names
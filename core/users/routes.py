@@ -1,36 +1,40 @@
 """Define the routes for the users module."""
 
+import json
 import uuid
 from urllib.parse import urlparse
 
 from flask import (
+    Response,
     current_app,
     jsonify,
     redirect,
     render_template,
     request,
+    stream_with_context,
     url_for,
 )
 from flask_login import current_user, login_required, login_user, logout_user
 from flask_wtf import FlaskForm
+from sqlalchemy.exc import IntegrityError
 
 from config.default import (
-    JWT_ENCODING_PARAM_1,
-    JWT_ENCODING_PARAM_2,
-    JWT_ENCODING_PARAM_3,
-    SECRET_KEY,
+    ITEMS_PER_PAGE,
+    MAX_ITEMS_PER_PAGE,
     SECURITY_PASSWORD_SALT,
+    STREAM_BATCH_SIZE,
 )
 from core import login_manager
-from core.auth.generic_encoder_decoder import (
-    encode_as_base64,
-)
+from core.auth.auth_guard import admin_required
+from core.auth.jwt.claims import CLAIM_USER_ID, decode_claims, encode_claims
 from core.auth.jwt.jwt_handler import decode_jwt, generate_jwt
+from core.auth.keyring import activation_key_ring
 from core.auth.middlewares.validation_token import (
     confirm_activation_token,
     generate_activation_token,
 )
 from core.common.credentials_validator import validate_account
+from core.common.cursors import decode_cursor, encode_cursor
 from core.common.error_codes import (
     __RESPONSE_STATUS_200,
     __RESPONSE_STATUS_403,
@@ -39,16 +43,26 @@ from core.common.error_codes import (
 from core.common.messages import (
     __ACCOUNT_ACTIVATED,
     __ACTIVATION_SUCCESSFUL,
+    __CURSOR_INVALID,
     __DEMAND_RENEW_ACTIVATION,
     __EMAIL_RESENT,
+    __EXPORT_FILTER_INVALID,
     __GENERIC_ERROR,
     __INVALID_TOKEN_ERROR,
     __SIGNUP_SUCCESSFUL,
     __USER_CREATION_ERROR,
     __USER_WITH_EMAIL_ALREADY_EXISTS,
+    __USER_WITH_USERNAME_ALREADY_EXISTS,
     __WELCOME_BACK,
 )
 from core.users import users_bp
+from core.users.exports import (
+    EXPORT_FORMATS,
+    EXPORT_MIMETYPES,
+    ExportStats,
+    export_users,
+    parse_filters,
+)
 from core.users.forms import SignupForm
 from core.users.models import GwUser
 
@@ -74,9 +88,9 @@ def load_user(user_id: uuid):
         user_id (uuid): The id of the user.
 
     Returns:
-        user: an instance for the logged in user.
+        Identity: the read-only identity of the logged in user.
     """
-    return GwUser.get_by_id(user_id)
+    return GwUser.get_cached_identity_by_id(user_id)
 
 
 @users_bp.route(
@@ -159,50 +173,50 @@ def signup():
             )
 
     elif form.validate():
-        # Check that a user with same email dose not already exist
-        user = GwUser.get_by_email(email)
-        if user:
+        user = GwUser(
+            username=username, email=check_account["email"], role=role
+        )
+        user.set_password(password)
+        # creation of JWT
+        user.last_activation_token = generate_activation_token(
+            activation_key_ring, SECURITY_PASSWORD_SALT, user.email
+        )
+        # Read before the commit expires the attributes of the user.
+        claims = encode_claims(user.id, [role] if role else [], user.email)
+
+        # The user, its role and its activation token in one transaction,
+        # the unique constraints reject the taken emails and usernames.
+        try:
+            user.create()
+        except IntegrityError as e:
+            duplicated_field = GwUser.get_duplicated_field(e)
+            if duplicated_field is None:
+                raise
             return (
                 jsonify(
                     {
-                        "error": __USER_WITH_EMAIL_ALREADY_EXISTS,
+                        "error": (
+                            __USER_WITH_EMAIL_ALREADY_EXISTS
+                            if duplicated_field == "email"
+                            else __USER_WITH_USERNAME_ALREADY_EXISTS
+                        ),
                         "status": __RESPONSE_STATUS_422,
                     }
                 ),
                 __RESPONSE_STATUS_422,
             )
-        else:
-            user = GwUser(username=username, email=check_account["email"])
-            user.set_password(password)
-            user.save()
 
-            GwUser.add_role_to_user_by_id(user.id, role)
+        login_user(user, remember=True)
 
-            login_user(user, remember=True)
+        # TODO: send the email to user for account activation.
 
-            # creation of JWT
-            activation_token = generate_activation_token(
-                SECRET_KEY, SECURITY_PASSWORD_SALT, user.email
-            )
-            user.last_activation_token = activation_token
-
-            # TODO: send the email to user for account activation.
-
-            jwt_token = initiate_session_jwt(
-                {
-                    JWT_ENCODING_PARAM_1: user.id,
-                    JWT_ENCODING_PARAM_3: user.email,
-                    JWT_ENCODING_PARAM_2: user.roles,
-                }
-            )
+        jwt_token = initiate_session_jwt(claims)
 
         return (
             jsonify(
                 {
                     "data": {
-                        "user": encode_as_base64(
-                            jwt_token[JWT_ENCODING_PARAM_1]
-                        ),
+                        "user": claims[CLAIM_USER_ID],
                         "jwt": jwt_token,
                     },
                     "status": __RESPONSE_STATUS_200,
@@ -229,25 +243,22 @@ def confirm_email(token):
         jwt_decoded = decode_jwt(jwt)
 
         email = confirm_activation_token(
-            SECRET_KEY, SECURITY_PASSWORD_SALT, token
+            activation_key_ring, SECURITY_PASSWORD_SALT, token
         )
-        user = GwUser.get_by_id(jwt_decoded[JWT_ENCODING_PARAM_1])
+        user_id = decode_claims(jwt_decoded).user_id
+        identity = GwUser.get_identity_by_id(user_id)
 
         user_activated = False
 
-        if user.email == email:
-            user_activated = GwUser.activate_by_id(
-                jwt_decoded[JWT_ENCODING_PARAM_1]
-            )
+        if identity.email == email:
+            user_activated = GwUser.activate_by_id(user_id)
 
         if user_activated.is_active():
             return (
                 jsonify(
                     {
                         "data": {
-                            "user": encode_as_base64(
-                                jwt_decoded[JWT_ENCODING_PARAM_1]
-                            ),
+                            "user": jwt_decoded[CLAIM_USER_ID],
                             "jwt": jwt,
                         },
                         "message": __ACTIVATION_SUCCESSFUL,
@@ -262,9 +273,7 @@ def confirm_email(token):
                 jsonify(
                     {
                         "data": {
-                            "user": encode_as_base64(
-                                jwt_decoded[JWT_ENCODING_PARAM_1]
-                            ),
+                            "user": jwt_decoded[CLAIM_USER_ID],
                             "jwt": jwt,
                         },
                         "error": __INVALID_TOKEN_ERROR,
@@ -300,15 +309,14 @@ def resend_confirmation_email():
         jwt = json["data"]["jwt"]
         jwt_decoded = decode_jwt(jwt)
 
-        user = GwUser.get_by_id(jwt_decoded[JWT_ENCODING_PARAM_1])
+        user_id = decode_claims(jwt_decoded).user_id
+        identity = GwUser.get_identity_by_id(user_id)
 
-        if not user.is_active():
+        if not identity.active:
             activation_token = generate_activation_token(
-                SECRET_KEY, SECURITY_PASSWORD_SALT, user.email
-            )
-            GwUser.reset_activation_token_by_id(
-                jwt_decoded[JWT_ENCODING_PARAM_1], activation_token
+                activation_key_ring, SECURITY_PASSWORD_SALT, identity.email
             )
+            GwUser.reset_activation_token_by_id(user_id, activation_token)
 
             # TODO
             # Send email validation via rabbit MQ
@@ -317,9 +325,7 @@ def resend_confirmation_email():
                 jsonify(
                     {
                         "data": {
-                            "user": encode_as_base64(
-                                jwt_decoded[JWT_ENCODING_PARAM_1]
-                            ),
+                            "user": jwt_decoded[CLAIM_USER_ID],
                             "jwt": jwt,
                         },
                         "status": __RESPONSE_STATUS_200,
@@ -334,9 +340,7 @@ def resend_confirmation_email():
             jsonify(
                 {
                     "data": {
-                        "user": encode_as_base64(
-                            jwt_decoded[JWT_ENCODING_PARAM_1]
-                        ),
+                        "user": jwt_decoded[CLAIM_USER_ID],
                         "jwt": jwt,
                     },
                     "status": __RESPONSE_STATUS_200,
@@ -392,6 +396,102 @@ def logout():
 @login_required
 @admin_required
 def list_users():
-    """Describe the view to list all the users."""
-    users = User.get_all()
-    return render_template("admin/users.html", users=users)
+    """Describe the view to list all the users.
+
+    The users come by pages of ?limit= users, ordered by creation date,
+    the next page is requested with the next_cursor of the previous one.
+    With ?stream=1 the whole table is sent as a single JSON array, written
+    as the rows are read.
+
+    Returns:
+        json: the page of users and the cursor of the next page.
+    """
+    if request.args.get("stream") in ("1", "true"):
+
+        def generate():
+            yield "["
+            for index, user in enumerate(GwUser.iter_all(STREAM_BATCH_SIZE)):
+                yield ("," if index else "") + json.dumps(user)
+            yield "]"
+
+        return Response(
+            stream_with_context(generate()), mimetype="application/json"
+        )
+
+    limit = min(
+        max(request.args.get("limit", ITEMS_PER_PAGE, type=int), 1),
+        MAX_ITEMS_PER_PAGE,
+    )
+    cursor = request.args.get("cursor")
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        return (
+            jsonify(
+                {
+                    "error": __CURSOR_INVALID,
+                    "message": str(e),
+                    "status": __RESPONSE_STATUS_422,
+                }
+            ),
+            __RESPONSE_STATUS_422,
+        )
+
+    users, last = GwUser.get_page(limit, after)
+    return (
+        jsonify(
+            {
+                "data": [user.to_dict() for user in users],
+                "next_cursor": encode_cursor(*last) if last else None,
+                "status": __RESPONSE_STATUS_200,
+            }
+        ),
+        __RESPONSE_STATUS_200,
+    )
+
+
+@users_bp.route("/admin/users/export")
+@login_required
+@admin_required
+def export_users_view():
+    """Describe the view exporting the users and their roles.
+
+    The query string selects the ?format= (csv or jsonl), ?gzip=1 and the
+    filters: active, deleted, role, created_from and created_to. The
+    export is written while the users are read.
+
+    Returns:
+        Response: the streamed export file.
+    """
+    export_format = request.args.get("format", "csv")
+    compress = request.args.get("gzip") in ("1", "true")
+    try:
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"format must be one of {EXPORT_FORMATS}")
+        filters = parse_filters(request.args)
+    except ValueError as e:
+        return (
+            jsonify(
+                {
+                    "error": __EXPORT_FILTER_INVALID,
+                    "message": str(e),
+                    "status": __RESPONSE_STATUS_422,
+                }
+            ),
+            __RESPONSE_STATUS_422,
+        )
+
+    def generate():
+        stats = ExportStats()
+        yield from export_users(export_format, compress, stats, **filters)
+        current_app.logger.info("Users export: %s", stats)
+
+    filename = f"users.{export_format}"
+    mimetype = EXPORT_MIMETYPES[export_format]
+    if compress:
+        filename, mimetype = f"{filename}.gz", "application/gzip"
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
@@ -0,0 +1,57 @@
+"""Create the users and roles tables.
+
+A database created before the migrations already has these tables, it is
+stamped with "flask db stamp 0001" before its first upgrade.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "gw_user",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("username", sa.String(length=30), nullable=False),
+        sa.Column("email", sa.String(length=80), nullable=False),
+        sa.Column("password", sa.String(length=50), nullable=False),
+        sa.Column("created_on", sa.DateTime(), nullable=False),
+        sa.Column(
+            "last_activation_token", sa.String(length=500), nullable=True
+        ),
+        sa.Column("active", sa.Boolean(), nullable=False),
+        sa.Column("activated_on", sa.DateTime(), nullable=True),
+        sa.Column("deactivated_on", sa.DateTime(), nullable=True),
+        sa.Column("jwt_session_id", sa.String(length=500), nullable=True),
+        sa.Column("deleted", sa.Boolean(), nullable=False),
+        sa.Column("is_admin", sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("email"),
+        sa.UniqueConstraint("username"),
+    )
+    op.create_table(
+        "gw_user_role",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("role", sa.String(length=50), nullable=False),
+        sa.Column("gwuser_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("created_on", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["gwuser_id"], ["gw_user.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade():
+    op.drop_table("gw_user_role")
+    op.drop_table("gw_user")
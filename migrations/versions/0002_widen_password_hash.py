@@ -0,0 +1,37 @@
+"""Widen the password column to the hash strings of every policy.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Widening a varchar is a catalog only change on PostgreSQL.
+    with op.batch_alter_table("gw_user") as batch_op:
+        batch_op.alter_column(
+            "password",
+            existing_type=sa.String(length=50),
+            type_=sa.String(length=255),
+            existing_nullable=False,
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("gw_user") as batch_op:
+        batch_op.alter_column(
+            "password",
+            existing_type=sa.String(length=255),
+            type_=sa.String(length=50),
+            existing_nullable=False,
+        )
@@ -0,0 +1,50 @@
+"""Index the hot lookups of the users and roles.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+# The indexes are built CONCURRENTLY, without locking the writes, which
+# PostgreSQL only allows outside a transaction.
+INDEXES = (
+    # The roles of a user, and the foreign key checks on user deletion.
+    ("ix_gw_user_role_gwuser_id", "gw_user_role (gwuser_id)"),
+    # GwUser.get_by_email compares lower(email).
+    ("ix_gw_user_email_lower", "gw_user (lower(email))"),
+    # Keyset pagination of the admin listing and the exports.
+    ("ix_gw_user_created_on_id", "gw_user (created_on, id)"),
+    # The same for the users not deleted, and the active ones.
+    (
+        "ix_gw_user_live_created_on_id",
+        "gw_user (created_on, id) WHERE NOT deleted",
+    ),
+    (
+        "ix_gw_user_active_created_on_id",
+        "gw_user (created_on, id) WHERE active AND NOT deleted",
+    ),
+)
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name, definition in INDEXES:
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS"
+                f" {name} ON {definition}"
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(INDEXES):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,76 @@
+"""Copy the names of the roles of the users into gw_user.role_names.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 10000
+
+# One batch of users, in the order of their id, with their roles in the
+# order of the relationship. Returns the last id of the batch.
+BACKFILL = sa.text("""
+    WITH batch AS (
+        SELECT id FROM gw_user
+        WHERE CAST(:after AS uuid) IS NULL OR id > CAST(:after AS uuid)
+        ORDER BY id
+        LIMIT :batch_size
+    ),
+    names AS (
+        SELECT batch.id,
+               coalesce(
+                   array_agg(r.role ORDER BY r.created_on, r.id)
+                       FILTER (WHERE r.role IS NOT NULL),
+                   '{}'
+               ) AS role_names
+        FROM batch
+        LEFT JOIN gw_user_role AS r ON r.gwuser_id = batch.id
+        GROUP BY batch.id
+    ),
+    updated AS (
+        UPDATE gw_user SET role_names = names.role_names
+        FROM names
+        WHERE gw_user.id = names.id
+        RETURNING gw_user.id
+    )
+    SELECT max(CAST(id AS text)) FROM updated
+    """)
+
+
+def upgrade():
+    # A constant default is a catalog only change, no rewrite of the table.
+    op.add_column(
+        "gw_user",
+        sa.Column(
+            "role_names",
+            postgresql.ARRAY(sa.String(length=50)),
+            nullable=False,
+            server_default="{}",
+        ),
+    )
+
+    # Each batch commits on its own, the locks are held for one batch only.
+    connection = op.get_bind()
+    with op.get_context().autocommit_block():
+        after = None
+        while True:
+            after = connection.execute(
+                BACKFILL, {"after": after, "batch_size": BACKFILL_BATCH_SIZE}
+            ).scalar()
+            if after is None:
+                break
+
+
+def downgrade():
+    op.drop_column("gw_user", "role_names")
@@ -0,0 +1,68 @@
+"""Make the emails of the users unique whatever their case.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+# The emails shared by several users once their case is folded.
+DUPLICATES = sa.text("""
+    SELECT lower(email) AS email, array_agg(username ORDER BY created_on)
+    FROM gw_user
+    GROUP BY lower(email)
+    HAVING count(*) > 1
+    ORDER BY lower(email)
+    LIMIT 20
+    """)
+
+# A failed CONCURRENTLY build leaves an invalid index behind.
+INVALID_INDEX = sa.text("""
+    SELECT 1 FROM pg_index
+    WHERE indexrelid = to_regclass('uq_gw_user_email_lower')
+      AND NOT indisvalid
+    """)
+
+
+def upgrade():
+    connection = op.get_bind()
+    duplicates = connection.execute(DUPLICATES).all()
+    if duplicates:
+        listed = "; ".join(
+            f"{email}: {', '.join(usernames)}"
+            for email, usernames in duplicates
+        )
+        raise Exception(
+            "Some users share an email differing only by its case, merge or"
+            f" rename them before upgrading: {listed}"
+        )
+
+    with op.get_context().autocommit_block():
+        if connection.execute(INVALID_INDEX).first():
+            op.execute("DROP INDEX CONCURRENTLY uq_gw_user_email_lower")
+        # Still built CONCURRENTLY, a signup racing the check above makes
+        # it fail, the upgrade can then be run again.
+        op.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS"
+            " uq_gw_user_email_lower ON gw_user (lower(email))"
+        )
+        # The unique index serves GwUser.get_by_email as well.
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_gw_user_email_lower")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS"
+            " ix_gw_user_email_lower ON gw_user (lower(email))"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS uq_gw_user_email_lower")
@@ -0,0 +1,93 @@
+"""Test the offline scoring of the passwords strength."""
+
+import random
+import string
+import time
+
+import pytest
+
+from core.services.validators.password_strength import (
+    COMMON_PASSWORDS,
+    PASSWORD_REQUIREMENTS_MESSAGE,
+    PasswordStrengthScorer,
+)
+
+WITH_DIGITS = sorted(
+    word
+    for word in COMMON_PASSWORDS
+    if any(character.isdigit() for character in word)
+)
+
+
+@pytest.fixture(autouse=True)
+def default_dictionary(monkeypatch):
+    """Restore the built-in dictionary after each test."""
+    for attribute in ("dictionary", "longest_word"):
+        monkeypatch.setattr(
+            PasswordStrengthScorer,
+            attribute,
+            getattr(PasswordStrengthScorer, attribute),
+        )
+
+
+@pytest.mark.parametrize("password", WITH_DIGITS)
+def test_common_passwords_with_digits_are_dictionary_words(password):
+    """Check the common passwords with digits score as dictionary words."""
+    assert PasswordStrengthScorer.score(
+        password
+    ) == PasswordStrengthScorer.score("password")
+
+
+@pytest.mark.parametrize("password", ["Trustno1", "p@ssword1", "PASSW0RD"])
+def test_variants_of_common_passwords_are_dictionary_words(password):
+    """Check the case and leet variants still match the dictionary."""
+    assert PasswordStrengthScorer.score(
+        password
+    ) == PasswordStrengthScorer.score("password")
+
+
+def test_loaded_words_with_digits_are_dictionary_words(tmp_path):
+    """Check the words of a loaded dictionary match with their digits."""
+    dictionary = tmp_path / "words.txt"
+    dictionary.write_text("gw2024admin\n", encoding="utf-8")
+    before = PasswordStrengthScorer.score("gw2024admin")
+
+    PasswordStrengthScorer.load_dictionary(str(dictionary))
+
+    assert PasswordStrengthScorer.score("gw2024admin") < before
+    assert PasswordStrengthScorer.score("trustno1") < 20
+
+
+def test_random_password_scores_high():
+    """Check a password without weak parts keeps a high score."""
+    assert PasswordStrengthScorer.score("xK9#mQ2$vL7!") >= 90
+
+
+def test_password_over_max_length_is_rejected_unscored():
+    """Check a password longer than max_length is rejected at once."""
+    password = "".join(random.choices(string.ascii_letters, k=10000))
+
+    started = time.perf_counter()
+    response = PasswordStrengthScorer.evaluate(
+        password, {"max_length": 50}, 70
+    )
+
+    assert time.perf_counter() - started < 0.1
+    assert response["message_password"] == PASSWORD_REQUIREMENTS_MESSAGE
+
+
+@pytest.mark.parametrize(
+    "password",
+    [
+        "".join(random.choices(string.ascii_letters, k=10000)),
+        "".join(chr(0x4E00 + offset) for offset in range(10000)),
+        "qwertyuiop" * 1000,
+    ],
+    ids=["random", "code point run", "keyboard rows"],
+)
+def test_long_password_scores_quickly(password):
+    """Check the scoring stays linear in the length of the password."""
+    started = time.perf_counter()
+    PasswordStrengthScorer.score(password)
+
+    assert time.perf_counter() - started < 1
@@ -0,0 +1,61 @@
+"""Test the registry compiling the roles into bit masks."""
+
+import pytest
+
+from core.auth.roles import RoleRegistry
+
+ROLES = ["admin", "user", "editor", "viewer"]
+
+
+def bits(registry: RoleRegistry) -> dict:
+    """Give the bit of every role of ROLES."""
+    return {role: registry.mask([role]) for role in ROLES}
+
+
+@pytest.mark.parametrize(
+    "inheritance, permissions",
+    [
+        ({"admin": ["editor"], "editor": ["viewer"]}, {}),
+        ({}, {"viewer": ["users:read"], "editor": ["users:write"]}),
+        ({"viewer": ["user"]}, {"admin": ["users:delete"]}),
+    ],
+)
+def test_bits_follow_roles_whatever_the_graph(inheritance, permissions):
+    """Check the inheritance and the permissions never move the bits."""
+    registry = RoleRegistry(ROLES, inheritance, permissions)
+
+    assert bits(registry) == bits(RoleRegistry(ROLES))
+    assert bits(registry) == {"admin": 1, "user": 2, "editor": 4, "viewer": 8}
+
+
+@pytest.mark.parametrize(
+    "inheritance, permissions",
+    [
+        ({"admin": ["editor"]}, {}),
+        ({"editor": ["user"]}, {}),
+        ({}, {"viewer": ["users:read"]}),
+    ],
+)
+def test_roles_missing_from_roles_are_rejected(inheritance, permissions):
+    """Check the graph cannot name a role without a bit in ROLES."""
+    with pytest.raises(Exception, match="not in ROLES"):
+        RoleRegistry(["admin", "user"], inheritance, permissions)
+
+
+def test_issued_user_mask_keeps_its_roles():
+    """Check a mask issued before the graph changed keeps its meaning."""
+    user_mask = RoleRegistry(ROLES).mask(["user"])
+    registry = RoleRegistry(
+        ROLES,
+        {"admin": ["editor"], "editor": ["viewer"]},
+        {"editor": ["users:write"]},
+    )
+
+    assert registry.effective_names(user_mask) == {"user"}
+    assert not registry.allows(user_mask, registry.require(("editor",)))
+    assert not registry.allows(
+        user_mask, registry.require(permissions=("users:write",))
+    )
+    assert registry.allows(
+        registry.mask(["admin"]), registry.require(("viewer",))
+    )
@@ -0,0 +1,90 @@
+"""Test the pooled client of the scoring service against its stand-in."""
+
+import pytest
+
+from benchmarks.scoring_pool import start_stub_server
+from core.services.http_client import PooledHttpClient
+
+CALLS = 20
+PAYLOAD = {
+    "password": "Sup3r-Secret",
+    "characteristics": {"min_length": 8, "max_length": 50},
+    "min_accepted_score": 70,
+}
+
+
+@pytest.fixture
+def scoring_server():
+    """Give a running stand-in of the scoring service counting its sockets."""
+    server = start_stub_server()
+    server.accepted = 0
+    get_request = server.get_request
+
+    def accept():
+        server.accepted += 1
+        return get_request()
+
+    server.get_request = accept
+    server.url = f"http://127.0.0.1:{server.server_port}/score"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def host_stats(stats: dict, url: str) -> dict:
+    """Give the statistics of the pool of the host of a url."""
+    return stats["pools"][url.rsplit("/", 1)[0]]
+
+
+def test_keep_alive_client_reuses_one_connection(scoring_server):
+    """Check sequential calls are all sent over the same connection."""
+    client = PooledHttpClient(pool_size=4)
+
+    for _ in range(CALLS):
+        response = client.post(scoring_server.url, json=PAYLOAD)
+        assert response.json()["score"] == 72
+
+    stats = client.stats()
+    assert scoring_server.accepted == 1
+    assert stats["requests"] == CALLS
+    assert stats["errors"] == 0
+    assert host_stats(stats, scoring_server.url) == {
+        "connections_opened": 1,
+        "requests": CALLS,
+        "idle_connections": 1,
+    }
+
+
+def test_client_without_keep_alive_opens_a_connection_per_call(
+    scoring_server,
+):
+    """Check the connections are not reused when keep_alive is off."""
+    client = PooledHttpClient(pool_size=4, keep_alive=False)
+
+    for _ in range(CALLS):
+        client.post(scoring_server.url, json=PAYLOAD)
+
+    assert scoring_server.accepted == CALLS
+    assert host_stats(client.stats(), scoring_server.url)["requests"] == CALLS
+
+
+def test_pool_stats_follow_the_password_validations(scoring_server):
+    """Check get_pool_stats reports the calls of is_valid_password."""
+    try:
+        from core.services.validators.passwords import PasswordValidator
+    except Exception as error:  # The settings files are missing.
+        pytest.skip(f"The settings cannot be loaded: {error}")
+    before = PasswordValidator.get_pool_stats()["requests"]
+
+    for index in range(CALLS):
+        response = PasswordValidator.is_valid_password(
+            url_api=scoring_server.url, password=f"Sup3r-Secret-{index}"
+        )
+        assert response["status"] is True
+
+    stats = PasswordValidator.get_pool_stats()
+    assert stats["requests"] - before == CALLS
+    assert stats["errors"] == 0
+    pool = host_stats(stats, scoring_server.url)
+    assert pool["requests"] == CALLS
+    assert pool["connections_opened"] == scoring_server.accepted == 1